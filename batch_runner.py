@@ -0,0 +1,130 @@
+import csv
+import os
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed, wait, FIRST_COMPLETED
+import config
+from config import patients_folder as PF, BATCH_WORKERS, PREFETCH_DEPTH
+from utils.instrumentation import configure_instrumentation, get_instrumentation_settings
+from utils.prefetch import prefetch
+
+def discover_patients(folder=PF):
+    """Returns every patient code under the patients folder that has its {code}.json."""
+    if not os.path.isdir(folder):
+        print(f"⚠️ Patients folder not found: {folder}")
+        return []
+    return sorted(
+        name for name in os.listdir(folder)
+        if os.path.isfile(os.path.join(folder, name, f"{name}.json"))
+    )
+
+def read_manifest(manifest_path):
+    """
+    Reads patient codes from a manifest file: one code per line, or the first
+    column of a CSV. Blank lines and lines starting with '#' are ignored.
+    """
+    patient_codes = []
+    with open(manifest_path, "r", encoding="utf-8-sig", newline="") as f:
+        for row in csv.reader(f):
+            if not row or not row[0].strip() or row[0].strip().startswith("#"):
+                continue
+            patient_codes.append(row[0].strip())
+    return patient_codes
+
+def _generate_one(patient_code, profile=None, inputs=None):
+    """
+    Worker entry point: generates one report and never raises, so a bad
+    patient only fails its own entry and the rest of the batch carries on.
+    profile / inputs are the patient's inputs already parsed or read by the prefetch stage.
+    """
+    from main import generate_patient_report
+
+    start = time.perf_counter()
+    try:
+        output_path = generate_patient_report(patient_code, profile=profile, inputs=inputs)
+        status = "ok" if output_path else "skipped"
+        error = None
+    except Exception:
+        output_path = None
+        status = "failed"
+        error = traceback.format_exc()
+    return {
+        "patient": patient_code,
+        "status": status,
+        "output": output_path,
+        "error": error,
+        "seconds": round(time.perf_counter() - start, 3),
+    }
+
+def apply_config_overrides(config_overrides):
+    """
+    Points config at other paths (e.g. a benchmark data set). Must run before the step
+    modules are imported, since they copy config values at import time.
+    """
+    for name, value in (config_overrides or {}).items():
+        setattr(config, name, value)
+
+def _init_worker(instrumentation_settings, config_overrides):
+    """Runs once in each worker process before it picks up any patient."""
+    apply_config_overrides(config_overrides)
+    configure_instrumentation(*instrumentation_settings)
+
+def _print_summary(results):
+    counts = {status: sum(1 for r in results if r["status"] == status) for status in ("ok", "skipped", "failed")}
+    print(f"\n📦 Batch finished: ✅ {counts['ok']} generated, ⚠️ {counts['skipped']} skipped, ❌ {counts['failed']} failed")
+    for result in results:
+        if result["status"] == "failed":
+            print(f"❌ {result['patient']} failed:\n{result['error']}")
+
+def run_batch(patient_codes, workers=BATCH_WORKERS, config_overrides=None):
+    """
+    Generates reports for the given patients on a pool of worker processes.
+    workers=None uses one process per CPU core; workers=1 runs in this process.
+    config_overrides are applied in every worker before it imports the report steps.
+    Returns one result dict per patient, in the order they were requested.
+    """
+    patient_codes = list(dict.fromkeys(patient_codes))  # Drop duplicates, keep order
+    if not patient_codes:
+        print("⚠️ No patients to process.")
+        return []
+
+    workers = min(workers or os.cpu_count() or 1, len(patient_codes))
+    print(f"🚀 Processing {len(patient_codes)} patient(s) with {workers} worker(s)")
+
+    # The prefetch stage reads inputs in this process, so it needs the same paths as the workers
+    apply_config_overrides(config_overrides)
+    from utils.patient_inputs import read_patient_inputs
+    from utils.patient_profile import load_patient_profile
+
+    if workers == 1:
+        # Parse the next patients' inputs on background threads while the current report renders
+        results = [_generate_one(code, profile=profile)
+                   for code, profile, _ in prefetch(patient_codes, load_patient_profile, PREFETCH_DEPTH)]
+    else:
+        results_by_code = {}
+
+        def collect(future, code):
+            try:
+                results_by_code[code] = future.result()
+            except Exception:
+                # The worker process itself died (e.g. out of memory)
+                results_by_code[code] = {"patient": code, "status": "failed", "output": None,
+                                         "error": traceback.format_exc(), "seconds": None}
+
+        # Workers start from a fresh interpreter on Windows, so hand them the settings explicitly
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(get_instrumentation_settings(), config_overrides)) as executor:
+            futures = {}
+            # Read inputs off the share ahead of the workers; at most workers + PREFETCH_DEPTH are held in memory
+            for code, inputs, _ in prefetch(patient_codes, read_patient_inputs, PREFETCH_DEPTH):
+                while len(futures) >= workers + PREFETCH_DEPTH:
+                    done, _ = wait(futures, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        collect(future, futures.pop(future))
+                futures[executor.submit(_generate_one, code, inputs=inputs)] = code
+            for future in as_completed(futures):
+                collect(future, futures[future])
+        results = [results_by_code[code] for code in patient_codes]
+
+    _print_summary(results)
+    return results
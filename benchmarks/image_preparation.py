@@ -0,0 +1,95 @@
+import argparse
+import json
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+# Allow running as `python benchmarks/image_preparation.py` from the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.run_benchmarks import read_records, silenced
+from benchmarks.synthetic_data import generate_synthetic_data
+
+def stage_mean(records, name):
+    walls = [row["wall_s"] for row in records if row["stage"] == name]
+    return round(statistics.mean(walls), 4) if walls else None
+
+def run_setting(root, overrides, codes, dpi, label, workers, quiet):
+    """Runs the batch with pictures resampled at dpi (None embeds the sources) and measures the reports."""
+    from batch_runner import run_batch
+    from utils.instrumentation import configure_instrumentation
+
+    outputs = os.path.join(root, f"outputs_{label}")
+    os.makedirs(outputs, exist_ok=True)
+    timings = os.path.join(root, f"timings_{label}.jsonl")
+    configure_instrumentation(timings)
+    setting = dict(overrides, IMAGE_TARGET_DPI=dpi, generated_outputs=outputs, GENERATED_OUTPUTS=outputs)
+    start = time.perf_counter()
+    with silenced(quiet):
+        results = run_batch(codes, workers=workers, config_overrides=setting)
+    wall = time.perf_counter() - start
+    configure_instrumentation(None, None)
+
+    records = read_records(timings)
+    sizes = [os.path.getsize(r["output"]) for r in results if r["output"] and os.path.exists(r["output"])]
+    return {
+        "dpi": dpi,
+        "failed": sum(1 for r in results if r["status"] != "ok"),
+        "wall_s": round(wall, 3),
+        "mean_output_kb": round(statistics.mean(sizes) / 1024, 1) if sizes else None,
+        "save_s": stage_mean(records, "save"),
+        "total_s": stage_mean(records, "total"),
+    }
+
+def run_benchmark(patient_count=10, dpis=(None, 220, 150), workers=2, data_dir=None, seed=0, quiet=True):
+    """
+    Generates a synthetic data set and builds every report once per DPI setting, twice:
+    first with an empty prepared-image cache, then with the copies already on disk.
+    """
+    root = data_dir or tempfile.mkdtemp(prefix="image_bench_")
+    print(f"🧪 Generating {patient_count} synthetic patient(s) in {root}")
+    overrides, codes = generate_synthetic_data(root, patient_count, seed)
+    cache_dir = overrides["PREPARED_IMAGE_CACHE_DIR"]
+
+    results = []
+    for dpi in dpis:
+        shutil.rmtree(cache_dir, ignore_errors=True)
+        name = "source" if dpi is None else f"{dpi}dpi"
+        results.append(dict(run_setting(root, overrides, codes, dpi, f"{name}_cold", workers, quiet), run="cold"))
+        if dpi is not None:
+            results.append(dict(run_setting(root, overrides, codes, dpi, f"{name}_warm", workers, quiet), run="warm"))
+    if not data_dir:
+        shutil.rmtree(root, ignore_errors=True)
+    return {"patients": len(codes), "workers": workers, "runs": results}
+
+def print_summary(summary):
+    print(f"\n📊 Picture resampling over {summary['patients']} synthetic patient(s), {summary['workers']} worker(s)")
+    print(f"  {'pictures':<12}{'cache':<7}{'report KB':>11}{'save s':>9}{'report s':>10}{'batch s':>9}")
+    for row in summary["runs"]:
+        name = "source" if row["dpi"] is None else f"{row['dpi']} dpi"
+        cache = "-" if row["dpi"] is None else row["run"]
+        print(f"  {name:<12}{cache:<7}{row['mean_output_kb']:>11}{row['save_s']:>9.4f}{row['total_s']:>10.4f}"
+              f"{row['wall_s']:>9.3f}")
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark report size and write time with resampled pictures.")
+    parser.add_argument("--patients", type=int, default=10, help="Number of synthetic patients (default: 10)")
+    parser.add_argument("--dpi", type=int, action="append", help="DPI to compare with the source images (repeatable; default: 220 and 150)")
+    parser.add_argument("--workers", type=int, default=2, help="Batch worker processes (default: 2)")
+    parser.add_argument("--data-dir", help="Folder for the synthetic data (default: a temporary folder)")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed for the synthetic patients")
+    parser.add_argument("--json", help="Also write the summary to this JSON file")
+    parser.add_argument("--verbose", action="store_true", help="Show the per-step report output")
+    return parser.parse_args(argv)
+
+if __name__ == "__main__":
+    args = parse_args()
+    summary = run_benchmark(args.patients, [None] + (args.dpi or [220, 150]), args.workers, args.data_dir,
+                            args.seed, quiet=not args.verbose)
+    print_summary(summary)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(summary, f, indent=2)
@@ -0,0 +1,163 @@
+import argparse
+import contextlib
+import json
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+# Allow running as `python benchmarks/run_benchmarks.py` from the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.synthetic_data import generate_synthetic_data
+
+def percentile(values, pct):
+    """Nearest-rank percentile of a list of numbers."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(0, min(len(ordered) - 1, round(pct / 100 * len(ordered) + 0.5) - 1))
+    return ordered[rank]
+
+@contextlib.contextmanager
+def silenced(enabled=True):
+    """Sends stdout (including that of worker processes) to the null device."""
+    if not enabled:
+        yield
+        return
+    sys.stdout.flush()
+    saved = os.dup(1)
+    with open(os.devnull, "w") as devnull:
+        os.dup2(devnull.fileno(), 1)
+        try:
+            with contextlib.redirect_stdout(devnull):
+                yield
+        finally:
+            sys.stdout.flush()
+            os.dup2(saved, 1)
+            os.close(saved)
+
+def read_records(path):
+    if not os.path.exists(path):
+        return []
+    with open(path, "r", encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+def summarize_stages(records):
+    """Groups instrumentation records by stage into wall-time statistics and call counts."""
+    stages = {}
+    for record in records:
+        stages.setdefault(record["stage"], []).append(record)
+    summary = {}
+    for name, rows in stages.items():
+        walls = [row["wall_s"] for row in rows]
+        summary[name] = {
+            "count": len(rows),
+            "mean_s": round(statistics.mean(walls), 4),
+            "p50_s": percentile(walls, 50),
+            "p95_s": percentile(walls, 95),
+            "read_excel": sum(row.get("read_excel") or 0 for row in rows),
+            "add_picture": sum(row.get("add_picture") or 0 for row in rows),
+            "swap_picture": sum(row.get("swap_picture") or 0 for row in rows),
+            "save": sum(row.get("save") or 0 for row in rows),
+        }
+    return summary
+
+def peak_memory_mb(records):
+    values = [row["peak_rss_mb"] for row in records if row.get("peak_rss_mb") is not None]
+    return max(values) if values else None
+
+def run_benchmarks(patient_count=20, workers=None, data_dir=None, seed=0, quiet=True):
+    """
+    Generates a synthetic data set, runs the full batch on a process pool and then every
+    patient one by one in this process, and returns a summary dictionary.
+    """
+    root = data_dir or tempfile.mkdtemp(prefix="report_bench_")
+    print(f"🧪 Generating {patient_count} synthetic patient(s) in {root}")
+    overrides, codes = generate_synthetic_data(root, patient_count, seed)
+
+    # Config must point at the synthetic data before any step module is imported
+    from batch_runner import apply_config_overrides, run_batch
+    from utils.instrumentation import configure_instrumentation
+    apply_config_overrides(overrides)
+
+    # Full batch first, so forked workers don't inherit caches warmed by the single runs
+    batch_timings = os.path.join(root, "timings_batch.jsonl")
+    configure_instrumentation(batch_timings)
+    start = time.perf_counter()
+    with silenced(quiet):
+        results = run_batch(codes, workers=workers, config_overrides=overrides)
+    batch_wall = time.perf_counter() - start
+    failed = [r for r in results if r["status"] != "ok"]
+
+    # Single reports in this process: the first one pays for cold caches
+    single_timings = os.path.join(root, "timings_single.jsonl")
+    configure_instrumentation(single_timings)
+    from main import generate_patient_report
+    latencies = []
+    with silenced(quiet):
+        for code in codes:
+            start = time.perf_counter()
+            generate_patient_report(code)
+            latencies.append(time.perf_counter() - start)
+    configure_instrumentation(None, None)
+
+    batch_records = read_records(batch_timings)
+    single_records = read_records(single_timings)
+    output_sizes = [os.path.getsize(r["output"]) for r in results if r["output"] and os.path.exists(r["output"])]
+    return {
+        "data_dir": root,
+        "patients": len(codes),
+        "batch": {
+            "workers": workers or os.cpu_count(),
+            "wall_s": round(batch_wall, 3),
+            "reports_per_minute": round(len(codes) / batch_wall * 60, 1) if batch_wall else None,
+            "failed": len(failed),
+            "peak_rss_mb_per_worker": peak_memory_mb(batch_records),
+            "mean_output_kb": round(statistics.mean(output_sizes) / 1024, 1) if output_sizes else None,
+        },
+        "single": {
+            "first_s": round(latencies[0], 4) if latencies else None,
+            "p50_s": percentile(latencies, 50),
+            "p95_s": percentile(latencies, 95),
+            "reports_per_minute": round(len(latencies) / sum(latencies) * 60, 1) if latencies else None,
+            "peak_rss_mb": peak_memory_mb(single_records),
+        },
+        "stages": summarize_stages(single_records),
+    }
+
+def print_summary(summary):
+    batch, single = summary["batch"], summary["single"]
+    print(f"\n📊 Benchmark over {summary['patients']} synthetic patient(s)")
+    print(f"  Batch ({batch['workers']} workers): {batch['wall_s']} s, {batch['reports_per_minute']} reports/min, "
+          f"{batch['failed']} failed, peak RSS {batch['peak_rss_mb_per_worker']} MB/worker, "
+          f"mean output {batch['mean_output_kb']} KB")
+    print(f"  Single process: first {single['first_s']} s, p50 {single['p50_s']:.4f} s, p95 {single['p95_s']:.4f} s, "
+          f"{single['reports_per_minute']} reports/min, peak RSS {single['peak_rss_mb']} MB")
+    print(f"\n  {'stage':<22}{'mean s':>10}{'p50 s':>10}{'p95 s':>10}{'excel':>8}{'pics':>8}{'swaps':>7}{'saves':>7}")
+    for name, row in summary["stages"].items():
+        print(f"  {name:<22}{row['mean_s']:>10.4f}{row['p50_s']:>10.4f}{row['p95_s']:>10.4f}"
+              f"{row['read_excel']:>8}{row['add_picture']:>8}{row['swap_picture']:>7}{row['save']:>7}")
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark report generation on synthetic data.")
+    parser.add_argument("--patients", type=int, default=20, help="Number of synthetic patients (default: 20)")
+    parser.add_argument("--workers", type=int, help="Batch worker processes (default: one per CPU core)")
+    parser.add_argument("--data-dir", help="Folder for the synthetic data (default: a temporary folder)")
+    parser.add_argument("--keep", action="store_true", help="Keep the generated data and reports")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed for the synthetic patients")
+    parser.add_argument("--json", help="Also write the summary to this JSON file")
+    parser.add_argument("--verbose", action="store_true", help="Show the per-step report output")
+    return parser.parse_args(argv)
+
+if __name__ == "__main__":
+    args = parse_args()
+    summary = run_benchmarks(args.patients, args.workers, args.data_dir, args.seed, quiet=not args.verbose)
+    print_summary(summary)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(summary, f, indent=2)
+    if not args.keep and not args.data_dir:
+        shutil.rmtree(summary["data_dir"], ignore_errors=True)
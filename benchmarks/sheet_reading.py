@@ -0,0 +1,91 @@
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+# Allow running as `python benchmarks/sheet_reading.py` from the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd
+from benchmarks.synthetic_data import build_reference_data, build_patients
+from utils.excel_reader import read_table
+
+def workbooks(root):
+    """Writes one workbook of every kind the report reads and returns {kind: path}."""
+    assets = os.path.join(root, "assets")
+    os.makedirs(assets, exist_ok=True)
+    build_reference_data(assets)
+    code = build_patients(root, 1, 0)[0]
+    return {
+        "scoring_chart": os.path.join(root, "ScoringCharts", "BATCH1", f"{code}_Scoring_chart.xlsx"),
+        "vitamin_sheet": os.path.join(root, "patients", code, f"{code}_vitamin_sheet.xlsx"),
+        "recommendations": os.path.join(assets, "Medical_Recommendations_sheet.xlsx"),
+        "first_text": os.path.join(assets, "Medical_First_Text_sheet.xlsx"),
+        "diet": os.path.join(assets, "Diet_Sheet.xlsx"),
+        "rda": os.path.join(assets, "Vitamin and minerals RDA.xlsx"),
+        "fitness": os.path.join(assets, "Male_Fitness_Nutrition_Data.xlsx"),
+    }
+
+def measure(read, path, runs):
+    """Median wall time and peak Python heap of reading path, in milliseconds and KB."""
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        read(path)
+        times.append(time.perf_counter() - start)
+    tracemalloc.start()
+    read(path)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return {"median_ms": round(statistics.median(times) * 1000, 3), "peak_kb": round(peak / 1024, 1)}
+
+def import_seconds(module, runs=5):
+    """Median time a fresh interpreter takes to import module."""
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", f"import {module}"], check=True)
+        times.append(time.perf_counter() - start)
+    return round(statistics.median(times), 4)
+
+def run_benchmark(runs=20, data_dir=None):
+    root = data_dir or tempfile.mkdtemp(prefix="sheet_bench_")
+    results = {"sheets": {}, "import_s": {"pandas": import_seconds("pandas"),
+                                           "openpyxl": import_seconds("openpyxl")}}
+    for kind, path in workbooks(root).items():
+        results["sheets"][kind] = {"pandas": measure(pd.read_excel, path, runs),
+                                   "read_table": measure(read_table, path, runs)}
+    if not data_dir:
+        shutil.rmtree(root, ignore_errors=True)
+    return results
+
+def print_summary(results):
+    imports = results["import_s"]
+    print(f"\n📊 Sheet reading: pd.read_excel vs read_table (interpreter import: pandas {imports['pandas']} s, "
+          f"openpyxl {imports['openpyxl']} s)")
+    print(f"  {'sheet':<18}{'pandas ms':>11}{'table ms':>10}{'speedup':>9}{'pandas KB':>11}{'table KB':>10}")
+    for kind, row in results["sheets"].items():
+        old, new = row["pandas"], row["read_table"]
+        print(f"  {kind:<18}{old['median_ms']:>11.2f}{new['median_ms']:>10.2f}"
+              f"{old['median_ms'] / new['median_ms']:>8.1f}x{old['peak_kb']:>11.1f}{new['peak_kb']:>10.1f}")
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Compare pd.read_excel with the openpyxl table reader.")
+    parser.add_argument("--runs", type=int, default=20, help="Reads per sheet and reader (default: 20)")
+    parser.add_argument("--data-dir", help="Folder for the generated workbooks (default: a temporary folder)")
+    parser.add_argument("--json", help="Also write the results to this JSON file")
+    return parser.parse_args(argv)
+
+if __name__ == "__main__":
+    args = parse_args()
+    results = run_benchmark(args.runs, args.data_dir)
+    print_summary(results)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
@@ -0,0 +1,71 @@
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# `python main.py --help` must answer within this many seconds (median of fresh interpreters)
+STARTUP_TARGET_S = 0.25
+
+# None of these may be imported before a report is actually rendered
+HEAVY_MODULES = ["pandas", "numpy", "openpyxl", "pptx", "PIL", "lxml"]
+
+LOADED_MODULES_SCRIPT = (
+    "import json, sys; import main; "
+    f"print(json.dumps([m for m in {HEAVY_MODULES!r} if m in sys.modules]))"
+)
+
+def time_command(command, runs):
+    """Runs command in a fresh interpreter runs times and returns the wall times in seconds."""
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run(command, cwd=REPO_ROOT, check=True, stdout=subprocess.DEVNULL)
+        times.append(time.perf_counter() - start)
+    return times
+
+def measure_startup(runs=10):
+    """Times bare Python, `import main` and `main.py --help`, and lists heavy modules `import main` loads."""
+    python = sys.executable
+    # One untimed run so the first measurement doesn't pay for writing .pyc files
+    subprocess.run([python, "-c", "import main"], cwd=REPO_ROOT, check=True)
+    results = {}
+    for name, command in (("python", [python, "-c", "pass"]),
+                          ("import_main", [python, "-c", "import main"]),
+                          ("cli_help", [python, "main.py", "--help"])):
+        times = time_command(command, runs)
+        results[name] = {"median_s": round(statistics.median(times), 4), "max_s": round(max(times), 4)}
+    loaded = subprocess.run([python, "-c", LOADED_MODULES_SCRIPT], cwd=REPO_ROOT, check=True,
+                            capture_output=True, text=True).stdout
+    results["heavy_modules_loaded"] = json.loads(loaded)
+    results["target_s"] = STARTUP_TARGET_S
+    results["passed"] = results["cli_help"]["median_s"] <= STARTUP_TARGET_S and not results["heavy_modules_loaded"]
+    return results
+
+def print_summary(results):
+    print(f"\n⏱️ Startup over fresh interpreters (target: main.py --help ≤ {results['target_s']} s)")
+    for name in ("python", "import_main", "cli_help"):
+        row = results[name]
+        print(f"  {name:<14}median {row['median_s']:.4f} s   max {row['max_s']:.4f} s")
+    loaded = results["heavy_modules_loaded"]
+    print(f"  heavy modules loaded by `import main`: {', '.join(loaded) if loaded else 'none'}")
+    print("✅ Startup target met." if results["passed"] else "❌ Startup target missed.")
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Measure how fast the report CLI starts.")
+    parser.add_argument("--runs", type=int, default=10, help="Interpreter launches per command (default: 10)")
+    parser.add_argument("--json", help="Also write the results to this JSON file")
+    return parser.parse_args(argv)
+
+if __name__ == "__main__":
+    args = parse_args()
+    results = measure_startup(args.runs)
+    print_summary(results)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+    sys.exit(0 if results["passed"] else 1)
@@ -0,0 +1,188 @@
+import json
+import os
+import random
+import pandas as pd
+from PIL import Image, ImageDraw
+from pptx import Presentation
+from pptx.util import Cm
+
+CONDITIONS = [
+    "Arrhythmias", "Cardiac_Health", "Cardiomyopathy", "Cholesterol_Disorders", "Dementia",
+    "Diabetes", "Fatty_Liver", "Gall_stones", "Gastritis", "Glomerular_Diseases", "Gut_Health",
+    "High_Blood_Pressure", "Mood_Disorders", "Muscular_health", "Obesity", "Renal_stones",
+    "Allergies", "Skin_Health", "Stroke", "Thyroid_Disorders",
+]
+SEVERITIES = ["Low", "Mild", "Moderate", "Moderate to High"]
+DIET_FOLDERS = ["Mild", "Moderate", "Moderate_to_High"]
+INTOLERANCE_KEYS = [
+    "Carbohydrate_Intolerance", "Lipid_Intolerance", "Protein_Intolerance",
+    "Lactose_Intolerance", "Gluten_Intolerance", "Insulin_Resistance",
+]
+NUTRIENTS = ["Vitamin A", "Vitamin B12", "Vitamin D", "Iron", "Calcium", "Zinc", "Magnesium", "Folate"]
+
+# Slide indices (0-based) the step modules write to
+RISK_SLIDES = {6: 11, 7: 8}  # slide -> number of thermometer pictures
+TABLE_SLIDES = [1, 2, 3]
+FITNESS_SLIDE = 35
+TEMPLATE_SLIDES = 40
+
+# Pixel sizes roughly matching the production PNGs
+CARD_PX = (2300, 830)
+THERMO_PX = (180, 560)
+
+def _png(path, size, seed):
+    """Writes a gradient PNG with a few bands, so it compresses like a real card, not a flat fill."""
+    rng = random.Random(seed)
+    base = tuple(rng.randrange(40, 220) for _ in range(3))
+    img = Image.linear_gradient("L").resize(size).convert("RGB")
+    overlay = Image.new("RGB", size, base)
+    img = Image.blend(img, overlay, 0.6)
+    draw = ImageDraw.Draw(img)
+    for i in range(8):
+        y = rng.randrange(size[1])
+        draw.rectangle([0, y, size[0], y + size[1] // 40], fill=tuple(255 - c for c in base))
+    img.save(path, dpi=(300, 300))
+
+def _makedirs(*parts):
+    path = os.path.join(*parts)
+    os.makedirs(path, exist_ok=True)
+    return path
+
+def build_template(path):
+    """Builds a 40-slide A4 portrait template with the placeholders and pictures the steps expect."""
+    prs = Presentation()
+    prs.slide_width, prs.slide_height = Cm(21), Cm(29.7)
+    blank = prs.slide_layouts[6]
+    thermo = os.path.join(os.path.dirname(path), "template_thermo.png")
+    _png(thermo, THERMO_PX, "template")
+
+    for index in range(TEMPLATE_SLIDES):
+        slide = prs.slides.add_slide(blank)
+        title = slide.shapes.add_textbox(Cm(1), Cm(1), Cm(19), Cm(1.5))
+        title.text_frame.text = f"Slide {index + 1} for {{Name}} ({{Sample_ID}}), age {{Age}}"
+        if index in RISK_SLIDES:
+            for i in range(RISK_SLIDES[index]):
+                slide.shapes.add_picture(thermo, Cm(1 + (i % 6) * 3), Cm(10 + (i // 6) * 5), Cm(1.46), Cm(1.36))
+        if index in TABLE_SLIDES:
+            table = slide.shapes.add_table(2, 2, Cm(1), Cm(3), Cm(19), Cm(2)).table
+            table.cell(0, 0).text = "{Gender}"
+            table.cell(0, 1).text = "{Sample_ID}"
+        if index == FITNESS_SLIDE:
+            box = slide.shapes.add_textbox(Cm(1), Cm(3), Cm(19), Cm(5))
+            points = [f"{{dopoint{i}}}" for i in range(1, 5)] + [f"{{dontpoint{i}}}" for i in range(1, 6)]
+            box.text_frame.text = "\n".join(points)
+    prs.save(path)
+
+def _reference_workbook(path, severities, text):
+    rows = []
+    for condition in CONDITIONS:
+        row = {"Condition": condition}
+        row.update({severity: text(condition, severity) for severity in severities})
+        rows.append(row)
+    pd.DataFrame(rows).to_excel(path, index=False)
+
+def build_reference_data(assets):
+    _reference_workbook(
+        os.path.join(assets, "Medical_Recommendations_sheet.xlsx"), SEVERITIES,
+        lambda c, s: f"Follow a {s.lower()} plan for {c.replace('_', ' ')}$Walk 30 minutes daily$ Sleep 7-8 hours ",
+    )
+    _reference_workbook(
+        os.path.join(assets, "Medical_First_Text_sheet.xlsx"), SEVERITIES,
+        lambda c, s: f"Your genetic risk for {c.replace('_', ' ')} is {s}, so regular screening and lifestyle changes are advised.",
+    )
+    _reference_workbook(
+        os.path.join(assets, "Diet_Sheet.xlsx"), SEVERITIES[1:],
+        lambda c, s: f"Prefer whole grains for {c.replace('_', ' ')}$Limit salt and sugar$Eat leafy greens$Stay hydrated",
+    )
+    pd.DataFrame({
+        "Nutrient": NUTRIENTS,
+        "Female (mg/day)": [0.7, 0.0024, 0.015, 18, 1000, 8, 320, 0.4],
+        "Male (mg/day)": [0.9, 0.0024, 0.015, 8, 1000, 11, 420, 0.4],
+    }).to_excel(os.path.join(assets, "Vitamin and minerals RDA.xlsx"), index=False)
+    for gender in ("Male", "Female"):
+        pd.DataFrame({
+            "Age": ["18-30 yrs", "31-45 yrs", "46 - 90 yrs"],
+            "Do’s": ["Run, Swim, Eat greens, Sleep early, Hydrate", "Walk, Yoga, Fruit, Fish, Stretch", "Walk, Stretch, Rest, Balance work"],
+            "Don’t’s": ["Smoke, Drink, Junk food, Sit long, Skip meals, Stress", None, "Lift heavy, Smoke, Skip checkups"],
+        }).to_excel(os.path.join(assets, f"{gender}_Fitness_Nutrition_Data.xlsx"), index=False)
+
+def build_images(root):
+    paths = {}
+    for severity in SEVERITIES:
+        folder = _makedirs(root, "parallelograms", severity)
+        for condition in CONDITIONS:
+            _png(os.path.join(folder, f"{condition}_{severity}.png"), CARD_PX, f"p{condition}{severity}")
+    for severity in DIET_FOLDERS:
+        folder = _makedirs(root, "Diet_pics", severity)
+        for condition in CONDITIONS:
+            _png(os.path.join(folder, f"Diet_{condition}.png"), CARD_PX, f"d{condition}{severity}")
+    folder = _makedirs(root, "scales_thermo")
+    for severity in SEVERITIES:
+        for suffix in ("", "1"):
+            path = os.path.join(folder, f"{severity.replace(' ', '_')}{suffix}.png")
+            _png(path, THERMO_PX, f"t{severity}{suffix}")
+            paths[f"{severity}{suffix}"] = path
+    return paths
+
+def build_patients(root, patient_count, seed):
+    rng = random.Random(seed)
+    patients_dir = _makedirs(root, "patients")
+    charts_dir = _makedirs(root, "ScoringCharts", "BATCH1")
+    codes = []
+    for n in range(patient_count):
+        code = f"SYN{n:05d}"
+        codes.append(code)
+        folder = _makedirs(patients_dir, code)
+        with open(os.path.join(folder, f"{code}.json"), "w", encoding="utf-8") as f:
+            json.dump({"Name": f"Patient {n}", "Age": rng.randrange(18, 80),
+                       "Gender": rng.choice(["Male", "Female"]), "Sample ID": code}, f)
+        with open(os.path.join(folder, f"{code}_intolerance.json"), "w", encoding="utf-8") as f:
+            json.dump({key: rng.choice(SEVERITIES) for key in INTOLERANCE_KEYS}, f)
+        pd.DataFrame({
+            "Condition": NUTRIENTS,
+            "Risk": [rng.choice([1, 2, 3, 0]) for _ in NUTRIENTS],
+        }).to_excel(os.path.join(folder, f"{code}_vitamin_sheet.xlsx"), index=False)
+
+        rows = []
+        for condition in CONDITIONS:
+            severity = rng.choices(SEVERITIES, weights=[4, 3, 2, 1])[0]
+            row = {"Medical Condition ": condition, "concerns": "y" if severity != "Low" and rng.random() < 0.4 else ""}
+            row.update({s: "y" if s == severity else "" for s in SEVERITIES})
+            rows.append(row)
+        pd.DataFrame(rows).to_excel(os.path.join(charts_dir, f"{code}_Scoring_chart.xlsx"), index=False)
+    return codes
+
+def generate_synthetic_data(root, patient_count, seed=0):
+    """
+    Writes the whole data set under root and returns (config_overrides, patient_codes).
+    The overrides point every config path at the generated files.
+    """
+    assets = _makedirs(root, "assets")
+    outputs = _makedirs(root, "Generated Outputs")
+    template = os.path.join(assets, "lifestyle_version2.pptx")
+    build_template(template)
+    build_reference_data(assets)
+    image_paths = build_images(root)
+    codes = build_patients(root, patient_count, seed)
+
+    overrides = {
+        "patients_folder": os.path.join(root, "patients"),
+        "lifeStyle_template": template,
+        "generated_outputs": outputs,
+        "GENERATED_OUTPUTS": outputs,
+        "scoring_charts": os.path.join(root, "ScoringCharts"),
+        "SCORING_CHART_INDEX_FILE": os.path.join(root, "cache", "scoring_chart_index.json"),
+        "PREPARED_IMAGE_CACHE_DIR": os.path.join(root, "cache", "prepared_images"),
+        "input_parallelograms": os.path.join(root, "parallelograms"),
+        "RECOMMENDATIONS_FILE": os.path.join(assets, "Medical_Recommendations_sheet.xlsx"),
+        "FIRST_TEXT_FILE": os.path.join(assets, "Medical_First_Text_sheet.xlsx"),
+        "DIET_FILE": os.path.join(assets, "Diet_Sheet.xlsx"),
+        "DIET_PICTURES": os.path.join(root, "Diet_pics"),
+        "MALE_FITNESS_EXCELL": os.path.join(assets, "Male_Fitness_Nutrition_Data.xlsx"),
+        "FEMALE_FITNESS_EXCELL": os.path.join(assets, "Female_Fitness_Nutrition_Data.xlsx"),
+        "RDA_FILE": os.path.join(assets, "Vitamin and minerals RDA.xlsx"),
+        "image_paths": image_paths,
+    }
+    with open(os.path.join(root, "config_overrides.json"), "w", encoding="utf-8") as f:
+        json.dump(overrides, f, indent=2)
+    return overrides, codes
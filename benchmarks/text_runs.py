@@ -0,0 +1,110 @@
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+# Allow running as `python benchmarks/text_runs.py` from the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pptx import Presentation
+from pptx.util import Cm, Pt
+from benchmarks.synthetic_data import build_reference_data, CONDITIONS, SEVERITIES
+from utils.reference_data import get_bullet_points, get_cell_values
+from utils.rich_text import set_text_defaults, word_spans, write_spans, write_lines, xml_size
+
+BOLD_WORDS = ['Moderate', 'Mild', 'Moderate to High']
+FONT_SIZE = Pt(9)
+
+def legacy_first_text(text_frame, text):
+    """The previous writer: an empty run, then one Arial 9 run per word."""
+    p = text_frame.paragraphs[0]
+    p.clear()
+    run = p.add_run()
+    run.font.name = "Arial"
+    run.font.size = FONT_SIZE
+    for word in text.split():
+        run = p.add_run()
+        run.text = word + ' '
+        run.font.name = "Arial"
+        run.font.size = FONT_SIZE
+        if word.strip(',') in BOLD_WORDS:
+            run.font.bold = True
+
+def legacy_lines(text_frame, lines):
+    """The previous bullet writer: font name and size repeated on every paragraph."""
+    for idx, line in enumerate(lines):
+        p = text_frame.paragraphs[0] if idx == 0 else text_frame.add_paragraph()
+        p.text = line
+        p.font.name = "Arial"
+        p.font.size = FONT_SIZE
+
+def coalesced_first_text(text_frame, text):
+    set_text_defaults(text_frame, "Arial", FONT_SIZE)
+    write_spans(text_frame.paragraphs[0], word_spans(text, BOLD_WORDS))
+
+def coalesced_lines(text_frame, lines):
+    set_text_defaults(text_frame, "Arial", FONT_SIZE)
+    write_lines(text_frame, lines)
+
+def measure(writer, items):
+    """Writes every item into a fresh text box; returns XML bytes, runs and milliseconds."""
+    prs = Presentation()
+    slide = prs.slides.add_slide(prs.slide_layouts[6])
+    size = runs = 0
+    start = time.perf_counter()
+    for item in items:
+        text_frame = slide.shapes.add_textbox(0, 0, Cm(10), Cm(3)).text_frame
+        writer(text_frame, item)
+    seconds = time.perf_counter() - start
+    for shape in slide.shapes:
+        size += xml_size(shape.text_frame._txBody)
+        runs += len(shape.text_frame._txBody.xpath(".//a:r"))
+    return {"xml_bytes": size, "runs": runs, "ms": round(seconds * 1000, 2)}
+
+def run_benchmark(data_dir=None, repeat=5):
+    root = data_dir or tempfile.mkdtemp(prefix="text_bench_")
+    assets = os.path.join(root, "assets")
+    os.makedirs(assets, exist_ok=True)
+    build_reference_data(assets)
+    first_file = os.path.join(assets, "Medical_First_Text_sheet.xlsx")
+    recommendations_file = os.path.join(assets, "Medical_Recommendations_sheet.xlsx")
+    first_texts = [text for c in CONDITIONS for s in SEVERITIES for text in get_cell_values(first_file, c, s)[:1]]
+    recommendations = [get_bullet_points(recommendations_file, c, s) for c in CONDITIONS for s in SEVERITIES]
+    first_texts *= repeat
+    recommendations *= repeat
+
+    results = {
+        "first_text": {"before": measure(legacy_first_text, first_texts),
+                       "after": measure(coalesced_first_text, first_texts)},
+        "recommendations": {"before": measure(legacy_lines, recommendations),
+                            "after": measure(coalesced_lines, recommendations)},
+    }
+    if not data_dir:
+        shutil.rmtree(root, ignore_errors=True)
+    return results
+
+def print_summary(results):
+    print("\n📊 Text box XML: per-word runs vs coalesced runs with list-style defaults")
+    print(f"  {'writer':<17}{'XML KB before':>15}{'after':>9}{'runs before':>13}{'after':>7}{'ms before':>11}{'after':>8}")
+    for name, row in results.items():
+        before, after = row["before"], row["after"]
+        print(f"  {name:<17}{before['xml_bytes'] / 1024:>15.1f}{after['xml_bytes'] / 1024:>9.1f}"
+              f"{before['runs']:>13}{after['runs']:>7}{before['ms']:>11.1f}{after['ms']:>8.1f}")
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Compare the size of the card text XML before and after run coalescing.")
+    parser.add_argument("--repeat", type=int, default=5, help="Times every reference text is written (default: 5)")
+    parser.add_argument("--data-dir", help="Folder for the generated workbooks (default: a temporary folder)")
+    parser.add_argument("--json", help="Also write the results to this JSON file")
+    return parser.parse_args(argv)
+
+if __name__ == "__main__":
+    args = parse_args()
+    results = run_benchmark(args.data_dir, args.repeat)
+    print_summary(results)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
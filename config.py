@@ -6,6 +6,11 @@ generated_outputs = r"M:\Kavya Project\LifeStyleAutomation-v1\Generated Outputs"
 
 scoring_charts = r"M:\Kavya Project\Regular&ScoringCharts\ScoringCharts"
 
+SCORING_CHART_INDEX_FILE = r"M:\Kavya Project\LifeStyleAutomation-v1\cache\scoring_chart_index.json"
+
+# Per-patient build manifests (input hashes) used to skip reports whose inputs have not changed
+BUILD_MANIFEST_DIR = r"M:\Kavya Project\LifeStyleAutomation-v1\cache\build_manifests"
+
 input_parallelograms = r"M:\Kavya Project\LifeStyleAutomation-v1\assets\lifestyleinputs\parallelograms"
 
 RECOMMENDATIONS_FILE = r"M:\\Kavya Project\\LifeStyleAutomation-v1\\assets\\Medical_Recommendations_sheet.xlsx"
@@ -18,6 +23,36 @@ DIET_PICTURES = r"M:\Kavya Project\LifeStyleAutomation-v1\assets\lifestyleinputs
 
 GENERATED_OUTPUTS = r"M:\Kavya Project\LifeStyleAutomation-v1\Generated Outputs"
 
+# Upper bound for the in-process image cache (least recently used images are dropped first)
+IMAGE_CACHE_MAX_BYTES = 256 * 1024 * 1024
+
+# Pictures are resampled to this many pixels per inch of the box they are placed in (None embeds the source files)
+IMAGE_TARGET_DPI = 220
+
+# Resampled pictures on disk, named by source hash and target pixel size
+PREPARED_IMAGE_CACHE_DIR = r"M:\Kavya Project\LifeStyleAutomation-v1\cache\prepared_images"
+
+# Font files used to measure text when laying out cards and bullet lists
+ARIAL_FONT = r"C:\Windows\Fonts\arial.ttf"
+ARIAL_BOLD_FONT = r"C:\Windows\Fonts\arialbd.ttf"
+
+# Number of worker processes for batch runs (None = one per CPU core)
+BATCH_WORKERS = None
+
+# Patients whose inputs are read ahead from the share while earlier reports render (0 turns it off)
+PREFETCH_DEPTH = 4
+
+# Resident report service (report_service.py): listen address, reports rendered at once
+# and seconds a request may wait for a free slot before it is refused
+SERVICE_HOST = "127.0.0.1"
+SERVICE_PORT = 8765
+SERVICE_MAX_CONCURRENCY = 2
+SERVICE_QUEUE_TIMEOUT = 30
+
+# Per-stage timing records (.jsonl or .csv) and cProfile dumps; None turns them off
+INSTRUMENTATION_FILE = None
+PROFILE_DIR = None
+
 MALE_FITNESS_EXCELL = r"M:\Kavya Project\LifeStyleAutomation-v1\assets\Male_Fitness_Nutrition_Data.xlsx"
 
 FEMALE_FITNESS_EXCELL = r"M:\Kavya Project\LifeStyleAutomation-v1\assets\Female_Fitness_Nutrition_Data.xlsx"
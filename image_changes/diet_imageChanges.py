@@ -1,8 +1,14 @@
-import os
-import pandas as pd
 from pptx import Presentation
 from pptx.util import Cm,Pt
-from config import scoring_charts, DIET_PICTURES as IMAGE_PATH, DIET_FILE
+from config import DIET_FILE
+from utils.patient_profile import load_patient_profile, read_scoring_chart
+from utils.reference_data import get_bullet_points
+from utils.image_cache import add_picture
+from utils.asset_index import find_diet_image
+from utils.layout import SlideStack, text_height
+from utils.slide_occupancy import mark_occupied
+from utils.card_fragments import place_card, template_version
+from utils.rich_text import set_text_defaults, write_lines
 
 START_SLIDE = 28  # 0-based index (27th slide)
 END_SLIDE = 31   # 0-based index (30th slide)
@@ -12,6 +18,7 @@ START_X = Cm(1)
 START_Y = Cm(9)
 END_Y = Cm(27)
 CARD_GAP = Cm(1)
+FONT_SIZE = 11
 SEVERITY_ORDER = ["Moderate to High", "Moderate", "Mild"]  # Priority order
 
 # Specific Moderate Conditions
@@ -36,117 +43,91 @@ MODERATE_TO_HIGH_SPECIFIC_CONDITIONS = {
     "Stroke"
 }
 
-def find_scoring_chart(patient_id):
-    for root, _, files in os.walk(scoring_charts):
-        for file in files:
-            if file.startswith(f"{patient_id}_Scoring_chart") and file.endswith(".xlsx"):
-                return os.path.join(root, file)
-    return None
-
 def extract_severity_conditions(excel_path):
-    df = pd.read_excel(excel_path)
-    concern_conditions = []
-    other_conditions = []
-    
-    for _, row in df.iterrows():
-        condition_name = row["Medical Condition "].replace(" ", "_")
-        is_concern = str(row.get("concerns", "")).strip().lower() == 'y'
-        
-        for severity in SEVERITY_ORDER:
-            if severity in df.columns and str(row.get(severity, '')).strip().lower() == 'y':
-                if is_concern:
-                    concern_conditions.append((severity, condition_name))
-                else:
-                    other_conditions.append((severity, condition_name))
-                    
-    return concern_conditions, other_conditions
+    return read_scoring_chart(excel_path).severity_conditions(SEVERITY_ORDER)
 
 def extract_recommendations(condition, severity):
     """
     Extracts recommendation points for a given condition and severity from the DIET_FILE.
     """
-    df = pd.read_excel(DIET_FILE)
-    if severity in df.columns:
-        recommendations = df[df["Condition"] == condition][severity].dropna().tolist()
-        formatted_recommendations = []
-        for rec in recommendations:
-            points = rec.split('$')
-            for point in points:
-                if point.strip():
-                    formatted_recommendations.append(f"\u2022 {point.strip()}")
-        return "\n".join(formatted_recommendations)
-    return ""
+    return "\n".join(get_bullet_points(DIET_FILE, condition, severity))
 
-def add_recommendation_textbox(slide, x_pos, y_pos, card_width, card_height, condition, severity):
+def recommendation_box(condition, severity):
     """
-    Adds a recommendation text box to the slide based on the card type and dimensions.
+    Returns the (x offset, y offset, width, height) of the recommendation text box for a card type,
+    and the severity its recommendations are looked up under.
     """
     if severity == "Mild":
         tb_height, tb_width = Cm(3.8), Cm(16.09)
-        tb_x, tb_y = x_pos + Cm(2.6), y_pos + Cm(1)
+        tb_x, tb_y = Cm(2.6), Cm(1)
     elif severity == "Moderate" and condition not in MODERATE_SPECIFIC_CONDITIONS:
         tb_height, tb_width = Cm(3.7), Cm(15.98)
-        tb_x, tb_y = x_pos + Cm(2.7), y_pos + Cm(1)
+        tb_x, tb_y = Cm(2.7), Cm(1)
     elif severity == "Moderate to High" and condition not in MODERATE_TO_HIGH_SPECIFIC_CONDITIONS:
         tb_height, tb_width = Cm(4), Cm(16.25)
-        tb_x, tb_y = x_pos + Cm(2.5), y_pos + Cm(1.15)
+        tb_x, tb_y = Cm(2.5), Cm(1.15)
     else:
         if condition in MODERATE_SPECIFIC_CONDITIONS:
             tb_height, tb_width = Cm(5.3), Cm(15.98)
-            tb_x, tb_y = x_pos + Cm(2.5), y_pos + Cm(1)
+            tb_x, tb_y = Cm(2.5), Cm(1)
             severity = "Moderate"
         if condition in MODERATE_TO_HIGH_SPECIFIC_CONDITIONS:
             tb_height, tb_width = Cm(6.5), Cm(16.25)
-            tb_x, tb_y = x_pos + Cm(2.5), y_pos + Cm(1.15)  
+            tb_x, tb_y = Cm(2.5), Cm(1.15)  
             severity == "Moderate to High"      
 
-    text_box = slide.shapes.add_textbox(tb_x, tb_y, tb_width, tb_height)
+    return (tb_x, tb_y, tb_width, tb_height), severity
+
+def measure_card(condition, severity, card_height):
+    """Returns the height a card takes on the slide, including recommendation text that runs past the picture."""
+    (_, tb_y, tb_width, _), severity = recommendation_box(condition, severity)
+    recommendations = extract_recommendations(condition, severity).split('\n')
+    return max(card_height, tb_y + text_height(recommendations, tb_width, FONT_SIZE))
+
+def add_recommendation_textbox(slide, x_pos, y_pos, card_width, card_height, condition, severity):
+    """
+    Adds a recommendation text box to the slide based on the card type and dimensions.
+    """
+    (tb_x, tb_y, tb_width, tb_height), severity = recommendation_box(condition, severity)
+
+    text_box = slide.shapes.add_textbox(x_pos + tb_x, y_pos + tb_y, tb_width, tb_height)
     text_frame = text_box.text_frame
     text_frame.clear()  # Clear default placeholder text
 
     recommendations = extract_recommendations(condition, severity)
     text_frame.word_wrap = True
-    for idx, rec in enumerate(recommendations.split('\n')):
-        if idx == 0:
-            p = text_frame.paragraphs[0]
-        else:
-            p = text_frame.add_paragraph()
-        p.text = rec
-        p.font.name = "Arial"
-        # Adjust font size based on text length
-        p.font.size = Pt(11)
+    set_text_defaults(text_frame, "Arial", Pt(FONT_SIZE))
+    write_lines(text_frame, recommendations.split('\n'))
 
-def add_diet_images(ppt_file, patient_id):
+def build_card(slide, x, y, card_width, card_height, condition, severity, image_path):
+    """Adds a diet picture and its recommendation text box, shape by shape."""
+    add_picture(slide, image_path, x, y, width=card_width, height=card_height)
+    add_recommendation_textbox(slide, x, y, card_width, card_height, condition, severity)
+
+def add_diet_images_in_prs(prs, profile):
     """
-    Adds diet images to the specified slides in the PowerPoint file.
+    Adds diet images to the specified slides of an already loaded presentation.
+    Returns True when the presentation was modified.
     """
-    # Find scoring chart
-    scoring_chart = find_scoring_chart(patient_id)
-    if not scoring_chart:
+    patient_id = profile.patient_code
+    if not profile.scoring_chart:
         print(f"Scoring chart not found for patient {patient_id}.")
-        return
+        return False
 
     # Extract severity conditions
-    concern_conditions, other_conditions = extract_severity_conditions(scoring_chart)
+    concern_conditions, other_conditions = profile.severity_conditions(SEVERITY_ORDER)
     if not concern_conditions and not other_conditions:
         print(f"No conditions found for patient {patient_id}.")
-        return
-
-    # Load presentation
-    prs = Presentation(ppt_file)
+        return False
 
     # Validate slide count
     if len(prs.slides) <= OTHER_END_SLIDE:
         print("PPTX file doesn't have enough slides.")
-        return
+        return False
 
     def find_image(condition, severity_folder):
         """Finds the image path based on the condition and severity."""
-        image_folder = os.path.join(IMAGE_PATH, severity_folder)
-        for file in os.listdir(image_folder):
-            if condition.lower() in file.lower():
-                return os.path.join(image_folder, file)
-        return None
+        return find_diet_image(condition, severity_folder)
 
     # Updated Dimensions
     MODERATE_SPECIFIC_HEIGHT = Cm(6.84)
@@ -165,12 +146,13 @@ def add_diet_images(ppt_file, patient_id):
     MILD_WIDTH = Cm(19.16)
 
     def insert_images(conditions, start_slide, end_slide):
-        slide_index = start_slide
-        x_pos, y_pos = START_X, START_Y
+        stack = SlideStack(start_slide, end_slide, START_Y, START_Y, END_Y, CARD_GAP)
+        planned_cards = []
 
         # Sort conditions by severity order
         conditions.sort(key=lambda x: SEVERITY_ORDER.index(x[0]) if x[0] in SEVERITY_ORDER else float('inf'))
 
+        # Plan every card of the section before creating any shapes
         for severity, condition in conditions:
             if severity == "Mild":
                 card_height, card_width = MILD_HEIGHT, MILD_WIDTH
@@ -200,28 +182,39 @@ def add_diet_images(ppt_file, patient_id):
             if not image_path:
                 print(f"Image not found for {condition} in {severity_folder} folder.")
                 continue
-            
+
+            # Move to the next slide when the measured card doesn't fit below the previous one
+            position = stack.place(measure_card(condition, severity, card_height))
+            if position is None:
+                print("No more space in slides.")
+                break
+            planned_cards.append((position, condition, severity, image_path, card_width, card_height))
+
+        for (slide_index, y_pos), condition, severity, image_path, card_width, card_height in planned_cards:
             slide = prs.slides[slide_index]
-            slide.shapes.add_picture(image_path, x_pos, y_pos, width=card_width, height=card_height)
+            mark_occupied(slide)
+            place_card(
+                slide, START_X, y_pos, (__name__, condition, severity, version),
+                (card_width, card_height, extract_recommendations(condition, recommendation_box(condition, severity)[1])),
+                (image_path,),
+                lambda slide, x, y: build_card(slide, x, y, card_width, card_height, condition, severity, image_path),
+            )
 
-            # Add recommendation text box
-            add_recommendation_textbox(slide, x_pos, y_pos, card_width, card_height, condition, severity)
-            
-            # Update Y position
-            y_pos += card_height + CARD_GAP
-            
-            # Check if we exceed the slide limit
-            if y_pos + card_height > END_Y:
-                slide_index += 1
-                y_pos = START_Y
-                if slide_index > end_slide:
-                    print("No more space in slides.")
-                    break
+    # Each (condition, severity) card is built once per template version and then copied into place
+    version = template_version()
 
     # Insert concern conditions
     insert_images(concern_conditions, START_SLIDE, END_SLIDE)
     # Insert other conditions
     insert_images(other_conditions, OTHER_START_SLIDE, OTHER_END_SLIDE)
 
-    prs.save(ppt_file)
     print("Diet image insertion completed.")
+    return True
+
+def add_diet_images(ppt_file, patient_id):
+    """
+    Adds diet images to the specified slides in the PowerPoint file.
+    """
+    prs = Presentation(ppt_file)
+    if add_diet_images_in_prs(prs, load_patient_profile(patient_id)):
+        prs.save(ppt_file)
@@ -1,21 +1,20 @@
-import json
 import os
 from pptx import Presentation
 from pptx.util import Cm, Pt
 from pptx.dml.color import RGBColor
-from config import patients_folder, image_paths, GENERATED_OUTPUTS
+from config import image_paths, GENERATED_OUTPUTS
+from utils.patient_profile import load_patient_profile
+from utils.image_cache import add_picture
+from utils.slide_occupancy import mark_occupied
 
 def cm_to_emu(cm):
     return int(cm * 360000)
 
-def add_intolerance_details(patient_code):
-    # Read intolerance data
-    json_path = os.path.join(patients_folder, patient_code, f"{patient_code}_intolerance.json")
-    with open(json_path, 'r') as f:
-        data = json.load(f)
-    
-    ppt_path = os.path.join(GENERATED_OUTPUTS, f"{patient_code}_report.pptx")
-    prs = Presentation(ppt_path)
+def add_intolerance_details_in_prs(prs, profile):
+    data = profile.intolerance
+    if data is None:
+        print(f"❌ Intolerance data not found for patient {profile.patient_code}")
+        return False
     
     # Configuration for positions
     image_config = {
@@ -44,12 +43,14 @@ def add_intolerance_details(patient_code):
     
     for slide_num in [37, 38]:
         slide = prs.slides[slide_num - 1]
+        mark_occupied(slide)
         
         # Add images
         for top, key in image_config[slide_num]:
             value = data[key]
             img_path = image_paths[f"{value}1"]
-            slide.shapes.add_picture(
+            add_picture(
+                slide,
                 img_path,
                 Cm(img_left),
                 Cm(top),
@@ -73,5 +74,11 @@ def add_intolerance_details(patient_code):
             run.font.size = Pt(12)
             run.font.bold = True
             run.font.color.rgb = RGBColor(255, 0, 0)
-    
-    prs.save(ppt_path)
+
+    return True
+
+def add_intolerance_details(patient_code):
+    ppt_path = os.path.join(GENERATED_OUTPUTS, f"{patient_code}_report.pptx")
+    prs = Presentation(ppt_path)
+    if add_intolerance_details_in_prs(prs, load_patient_profile(patient_code)):
+        prs.save(ppt_path)
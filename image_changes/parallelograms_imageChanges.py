@@ -1,11 +1,18 @@
 import os
-import pandas as pd
 from pptx import Presentation
 from pptx.util import Cm,Pt
 from pptx.enum.text import MSO_AUTO_SIZE
 from pptx.oxml.ns import qn
 from pptx.oxml import parse_xml
-from config import scoring_charts, input_parallelograms, generated_outputs as GO, RECOMMENDATIONS_FILE, FIRST_TEXT_FILE
+from config import generated_outputs as GO, RECOMMENDATIONS_FILE, FIRST_TEXT_FILE
+from utils.patient_profile import load_patient_profile, read_scoring_chart
+from utils.reference_data import get_bullet_points, get_cell_values
+from utils.image_cache import add_picture
+from utils.asset_index import find_parallelogram_image
+from utils.layout import SlideStack, text_height
+from utils.slide_occupancy import mark_occupied
+from utils.card_fragments import place_card, template_version
+from utils.rich_text import set_text_defaults, word_spans, write_spans, write_lines
 
 # Image sizes
 IMAGE_SIZES = {
@@ -70,108 +77,108 @@ OTHER_END_SLIDE = 22
 SEVERITY_ORDER = ["Moderate to High", "Moderate", "Mild", "Low"]  # Priority order
 
 BOLD_WORDS = ['Moderate', 'Mild', 'Moderate to High']
-
-def find_scoring_chart(patient_id):
-    for root, _, files in os.walk(scoring_charts):
-        for file in files:
-            if file.startswith(f"{patient_id}_Scoring_chart") and file.endswith(".xlsx"):
-                return os.path.join(root, file)
-    return None
-
+FONT_SIZE = 9
 
 def extract_severity_conditions(excel_path):
-    df = pd.read_excel(excel_path)
-    concern_conditions = []
-    other_conditions = []
-
-    for _, row in df.iterrows():
-        condition_name = row["Medical Condition "].replace(" ", "_")
-        is_concern = str(row.get("concerns", "")).strip().lower() == 'y'
-
-        for severity in SEVERITY_ORDER:
-            if severity in df.columns and str(row.get(severity, '')).strip().lower() == 'y':
-                if is_concern:
-                    concern_conditions.append((severity, condition_name))
-                else:
-                    other_conditions.append((severity, condition_name))
-    
+    concern_conditions, other_conditions = read_scoring_chart(excel_path).severity_conditions(SEVERITY_ORDER)
     print("Concern Conditions:", concern_conditions)
     print("Other Conditions:", other_conditions)
     return concern_conditions, other_conditions
 
 
 def find_condition_image(severity, condition):
-    severity_path = os.path.join(input_parallelograms, severity)
-    if os.path.exists(severity_path):
-        for file in os.listdir(severity_path):
-            if file.lower().startswith(condition.lower()) and file.endswith(".png"):
-                return os.path.join(severity_path, file)
-    return None
+    return find_parallelogram_image(severity, condition)
 
 
 def extract_recommendations(condition, severity):
-    df = pd.read_excel(RECOMMENDATIONS_FILE)
-    if severity in df.columns:
-        recommendations = df[df["Condition"] == condition][severity].dropna().tolist()
-        formatted_recommendations = []
-        for rec in recommendations:
-            points = rec.split('$')
-            for point in points:
-                if point.strip():
-                    formatted_recommendations.append(f"\u2022 {point.strip()}")
-        return "\n".join(formatted_recommendations)
-    return ""
+    return "\n".join(get_bullet_points(RECOMMENDATIONS_FILE, condition, severity))
 
 def extract_first_text(condition, severity):
-    df = pd.read_excel(FIRST_TEXT_FILE)
-    if severity in df.columns:
-        first_text = df[df["Condition"] == condition][severity].dropna().tolist()
-        if first_text:
-            return first_text[0]
+    first_text = get_cell_values(FIRST_TEXT_FILE, condition, severity)
+    if first_text:
+        return first_text[0]
     return ""
 
 def add_text_with_formatting(text_frame, text):
-    p = text_frame.paragraphs[0]
-    p.clear()
-    run = p.add_run()
-    run.font.name = "Arial"
-    run.font.size = Pt(9)  # Arial 9
-
-    words = text.split()
-    for word in words:
-        run = p.add_run()
-        run.text = word + ' '
-        run.font.name = "Arial"
-        run.font.size = Pt(9)
-        if word.strip(',') in BOLD_WORDS:
-            run.font.bold = True
-
-
-def insert_parallelogram_images(patient_id):
-    output_ppt_path = os.path.join(GO, f"{patient_id}_report.pptx")
-    if not os.path.exists(output_ppt_path):
-        print(f"❌ Report not found for patient {patient_id}")
+    """Writes text in Arial 9 with the BOLD_WORDS in bold, one run per stretch of equal formatting."""
+    set_text_defaults(text_frame, "Arial", Pt(FONT_SIZE))
+    write_spans(text_frame.paragraphs[0], word_spans(text, BOLD_WORDS))
+
+
+def measure_card(severity, condition):
+    """
+    Measures the wrapped text of a card. Returns the first text, the recommendation lines,
+    the heights of the two text boxes and the height the card takes on the slide.
+    """
+    img_height, _ = IMAGE_SIZES[severity]
+    if severity not in TEXT_BOX_PARAMS:
+        return "", [], [], img_height
+
+    (first_h, first_w, _, first_vp), (_, rec_w, _, rec_vp) = TEXT_BOX_PARAMS[severity]
+    first_text = extract_first_text(condition, severity)
+    recommendations = extract_recommendations(condition, severity).split('\n')
+    first_height = max(first_h, text_height([first_text], first_w, FONT_SIZE))
+    rec_height = text_height(recommendations, rec_w, FONT_SIZE)
+    card_height = max(img_height, first_vp + first_height, rec_vp + rec_height)
+    return first_text, recommendations, [first_height, rec_height], card_height
+
+
+def build_card(slide, x, y, severity, image_path, first_text, recommendations, box_heights):
+    """Adds the parallelogram picture and its text boxes sized to the measured text, shape by shape."""
+    img_height, img_width = IMAGE_SIZES[severity]
+    add_picture(slide, image_path, x, y, width=img_width, height=img_height)
+
+    if severity not in TEXT_BOX_PARAMS:
         return
-
-    prs = Presentation(output_ppt_path)
-    scoring_chart = find_scoring_chart(patient_id)
-    if not scoring_chart:
+    for i, ((_, tb_w, hp, vp), tb_h) in enumerate(zip(TEXT_BOX_PARAMS[severity], box_heights)):
+        text_box = slide.shapes.add_textbox(x + hp, y + vp, tb_w, tb_h)
+        text_frame = text_box.text_frame
+        text_frame.clear()  # Clear default placeholder text
+        text_frame.word_wrap = True
+
+        if i == 0:  # First text box
+            add_text_with_formatting(text_frame, first_text)
+        elif i == 1:  # Recommendation text box
+            text_frame.auto_size = MSO_AUTO_SIZE.SHAPE_TO_FIT_TEXT
+            set_text_defaults(text_frame, "Arial", Pt(FONT_SIZE))
+            write_lines(text_frame, recommendations)
+
+
+def add_card(slide, y, severity, condition, image_path, first_text, recommendations, box_heights, version):
+    """
+    Adds a planned card. Each (condition, severity) card is built once per template version
+    and then copied into place, since only its position differs between patients.
+    """
+    mark_occupied(slide)
+    place_card(
+        slide, START_X, y, (__name__, condition, severity, version),
+        (first_text, tuple(recommendations), tuple(box_heights)), (image_path,),
+        lambda slide, x, y: build_card(slide, x, y, severity, image_path, first_text, recommendations, box_heights),
+    )
+
+
+def insert_parallelogram_images_in_prs(prs, profile):
+    """
+    Inserts parallelogram cards into an already loaded presentation.
+    Returns True when the presentation was modified.
+    """
+    patient_id = profile.patient_code
+    if not profile.scoring_chart:
         print(f"❌ No scoring chart found for patient {patient_id}")
-        return
+        return False
 
-    concern_conditions, other_conditions = extract_severity_conditions(scoring_chart)
+    concern_conditions, other_conditions = profile.severity_conditions(SEVERITY_ORDER)
+    print("Concern Conditions:", concern_conditions)
+    print("Other Conditions:", other_conditions)
     if not concern_conditions and not other_conditions:
         print(f"⚠️ No conditions found for patient {patient_id}")
-        return
+        return False
 
     # Track processed conditions
     processed_conditions = set()
+    planned_cards = []
 
-    def insert_conditions(conditions, start_slide, end_slide, start_y):
-        current_y = start_y
-        slide_index = start_slide
-        slide = prs.slides[slide_index]
-
+    def plan_conditions(conditions, stack):
         # Sort conditions by severity order
         conditions.sort(key=lambda x: SEVERITY_ORDER.index(x[0]))
 
@@ -183,56 +190,41 @@ def insert_parallelogram_images(patient_id):
                 print(f"❌ Image not found for {condition} ({severity})")
                 continue
 
-            img_height, img_width = IMAGE_SIZES[severity]
-            if current_y + img_height > MAX_Y:
-                slide_index += 1
-                if slide_index > end_slide:
-                    print(f"⚠️ Slide limit reached for current section (limit: {end_slide}), stopping.")
-                    break
-                slide = prs.slides[slide_index]
-                current_y = START_Y
-
-            slide.shapes.add_picture(image_path, START_X, current_y, width=img_width, height=img_height)
-
-            if severity in TEXT_BOX_PARAMS:
-                for i, (tb_h, tb_w, hp, vp) in enumerate(TEXT_BOX_PARAMS[severity]):
-                    text_box = slide.shapes.add_textbox(START_X + hp, current_y + vp, tb_w, tb_h)
-                    text_frame = text_box.text_frame
-                    text_frame.clear()  # Clear default placeholder text
-
-                    if i == 0:  # First text box
-                        first_text = extract_first_text(condition, severity)
-                        add_text_with_formatting(text_frame, first_text)
-                    elif i == 1:  # Recommendation text box
-                        text_frame.word_wrap = True
-                        text_frame.auto_size = MSO_AUTO_SIZE.SHAPE_TO_FIT_TEXT
-                        recommendations = extract_recommendations(condition, severity)
-                        for idx, rec in enumerate(recommendations.split('\n')):
-                            if idx == 0:
-                                p = text_frame.paragraphs[0]
-                            else:
-                                p = text_frame.add_paragraph()
-                            p.text = rec
-                            p.font.name = "Arial"
-                            p.font.size = Pt(9)
-
-            current_y += img_height + SPACING
-
-        return slide_index, current_y
-
-    # Insert concern conditions in slides 9-14
-    _, _ = insert_conditions(concern_conditions, CONCERN_START_SLIDE, CONCERN_END_SLIDE, START_Y)
-    
-    # Insert other conditions in slides 15-29
-    current_slide, current_y = insert_conditions(other_conditions, OTHER_START_SLIDE, OTHER_END_SLIDE, START_Y)
-
-    # Add missing low conditions to the remaining space in other conditions section
+            first_text, recommendations, box_heights, card_height = measure_card(severity, condition)
+            position = stack.place(card_height)
+            if position is None:
+                print(f"⚠️ Slide limit reached for current section (limit: {stack.end_slide}), stopping.")
+                break
+            planned_cards.append((position, severity, condition, image_path, first_text, recommendations, box_heights))
+
+    # Plan every card before creating any shapes: concern conditions in slides 9-14
+    plan_conditions(concern_conditions, SlideStack(CONCERN_START_SLIDE, CONCERN_END_SLIDE, START_Y, START_Y, MAX_Y, SPACING))
+
+    # Other conditions in slides 15-22, then the missing low conditions in the space that remains
+    other_stack = SlideStack(OTHER_START_SLIDE, OTHER_END_SLIDE, START_Y, START_Y, MAX_Y, SPACING)
+    plan_conditions(other_conditions, other_stack)
     missing_low_conditions = [(severity, condition) for severity, condition in [("Low", c) for c in LOW_LIST] 
                             if condition not in processed_conditions]
-    insert_conditions(missing_low_conditions, current_slide, OTHER_END_SLIDE, current_y)
+    plan_conditions(missing_low_conditions, other_stack)
+
+    version = template_version()
+    for (slide_index, y), severity, condition, image_path, first_text, recommendations, box_heights in planned_cards:
+        add_card(prs.slides[slide_index], y, severity, condition, image_path, first_text, recommendations,
+                 box_heights, version)
 
-    prs.save(output_ppt_path)
     print(f"✅ Parallelogram Images and Textboxes inserted for patient {patient_id}")
+    return True
+
+
+def insert_parallelogram_images(patient_id):
+    output_ppt_path = os.path.join(GO, f"{patient_id}_report.pptx")
+    if not os.path.exists(output_ppt_path):
+        print(f"❌ Report not found for patient {patient_id}")
+        return
+
+    prs = Presentation(output_ppt_path)
+    if insert_parallelogram_images_in_prs(prs, load_patient_profile(patient_id)):
+        prs.save(output_ppt_path)
 
 
 
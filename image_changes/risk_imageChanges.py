@@ -1,29 +1,48 @@
-import os
-import shutil
-import pandas as pd
 from pptx import Presentation
+from pptx.oxml.ns import qn
 from pptx.util import Inches
-from config import scoring_charts, image_paths
+from config import image_paths
+from utils.scoring_chart_index import find_scoring_chart
+from utils.patient_profile import read_scoring_chart
+from utils.image_cache import add_picture, get_or_add_image_part
+from utils.instrumentation import count_event
 
 def process_excel(patient_code):
     """Extract severity levels for medical conditions from the patient's Excel file."""
-    excel_path = os.path.join(scoring_charts, f"BATCH1/{patient_code}_Scoring_chart.xlsx")
-    df = pd.read_excel(excel_path)
-    
-    severity_columns = ["Low", "Mild", "Moderate", "Moderate to High"]
-    severity_mapping = {}
-    
-    for _, row in df.iterrows():
-        condition = row["Medical Condition "]
-        severity = next((col for col in severity_columns if row.get(col) == 'y'), "Low")
-        severity_mapping[condition] = severity
+    excel_path = find_scoring_chart(patient_code)
+    if not excel_path:
+        print(f"❌ No scoring chart found for patient {patient_code}")
+        return None
+    severity_mapping = read_scoring_chart(excel_path).severity_mapping
     
     print("\n✅ Extracted Severity Mapping:", severity_mapping)
     return severity_mapping
 
-def replace_ppt_images(ppt_path, severity_mapping):
-    """Replace images in PowerPoint slides based on severity levels."""
-    prs = Presentation(ppt_path)
+def swap_picture_image(slide, shape, image_path):
+    """
+    Points an existing picture at another image, keeping its element, geometry and z-order.
+    Returns the rId the picture used before.
+    """
+    count_event("swap_picture")
+    blip = shape._element.blipFill.blip
+    old_rId = blip.get(qn("r:embed"))
+    _, rId = get_or_add_image_part(slide, image_path, shape.width, shape.height)
+    blip.set(qn("r:embed"), rId)
+    return old_rId
+
+def drop_unreferenced_rels(slide, rIds):
+    """Drops the given relationships of a slide once no element of the slide refers to them."""
+    referenced = set(slide._element.xpath("//@r:embed | //@r:link | //@r:id"))
+    for rId in set(rIds) - referenced:
+        slide.part.rels.pop(rId)
+
+def replace_prs_images(prs, severity_mapping, swap=True):
+    """
+    Replace images in an already loaded presentation based on severity levels.
+    With swap, each thermometer picture of the template is re-pointed at the shared image
+    part of its severity, so the deck holds one part per severity level and every picture
+    keeps the template's position, size and stacking. Without it the pictures are re-added.
+    """
     slide_mapping = {
         6: [
             "Diabetes", "High_Blood_Pressure", "Cardiac_Health", "Cholesterol_Disorders",
@@ -42,6 +61,7 @@ def replace_ppt_images(ppt_path, severity_mapping):
     for slide_index, conditions in slide_mapping.items():
         slide = prs.slides[slide_index]
         image_shapes = [shape for shape in slide.shapes if shape.shape_type == 13]
+        replaced_rIds = []
         
         for i, condition in enumerate(conditions):
             if i < len(image_shapes):
@@ -49,14 +69,35 @@ def replace_ppt_images(ppt_path, severity_mapping):
                 new_image_path = image_paths[severity]
                 shape = image_shapes[i]
                 
-                slide.shapes._spTree.remove(shape._element)
-                slide.shapes.add_picture(new_image_path, shape.left, shape.top, width=Inches(width_inches), height=Inches(height_inches))
+                if swap:
+                    replaced_rIds.append(swap_picture_image(slide, shape, new_image_path))
+                else:
+                    slide.shapes._spTree.remove(shape._element)
+                    add_picture(slide, new_image_path, shape.left, shape.top, width=Inches(width_inches), height=Inches(height_inches))
                 print(f"✅ Replaced image for '{condition}' on slide {slide_index + 1} with severity '{severity}'.")
-    
+
+        # The template's own thermometer images are no longer shown, so they aren't written either
+        drop_unreferenced_rels(slide, replaced_rIds)
+
+def replace_ppt_images(ppt_path, severity_mapping):
+    """Replace images in PowerPoint slides based on severity levels."""
+    prs = Presentation(ppt_path)
+    replace_prs_images(prs, severity_mapping)
     prs.save(ppt_path)
     print(f"\n✅ Updated PowerPoint saved: {ppt_path}")
 
+def process_risk_images_in_prs(prs, profile):
+    """Processes risk images for a given patient on an already loaded presentation."""
+    if not profile.scoring_chart:
+        print(f"❌ No scoring chart found for patient {profile.patient_code}")
+        return False
+    print("\n✅ Extracted Severity Mapping:", profile.severity_mapping)
+    replace_prs_images(prs, profile.severity_mapping)
+    return True
+
 def process_risk_images(patient_code, ppt_path):
     """Main function to process risk images for a given patient."""
     severity_mapping = process_excel(patient_code)
+    if severity_mapping is None:
+        return
     replace_ppt_images(ppt_path, severity_mapping)
@@ -1,110 +1,173 @@
+import argparse
+import importlib
 import os
-import shutil
-from pptx import Presentation
-from config import patients_folder as PF, generated_outputs as GO, lifeStyle_template as LT
-from text_changes.change_SequencingDetails import replace_text_in_ppt
-from image_changes.parallelograms_imageChanges import insert_parallelogram_images
-from image_changes.diet_imageChanges import add_diet_images  
-from text_changes.change_VitaminDetails import update_vitamin_details
-from image_changes.risk_imageChanges import process_risk_images
-from text_changes.change_Gender_NutritionFitness import update_gender_nutrition_fitness
-from image_changes.intolerance_imageChanges import add_intolerance_details
-
-# Define patient names to process (one by one)
-selected_patients = ["KHINDNGPCSP3"]
-
-def copy_template_ppt(target_path):
-    """Copies the actual PPT template to the target location for modifications."""
-    shutil.copy(LT, target_path)  
-    print(f"📂 Template copied to: {target_path}")
-
-# Define Y-coordinate bounds for checking empty slides (1 cm = 360000 EMUs)
-START_Y = 9 * 360000  
-MAX_Y = 26 * 360000  
-
-def has_content(slide):
-    """Checks if a slide contains any shapes (images, textboxes, or tables) in the valid area."""
-    # Check for shapes in valid area
-    for shape in slide.shapes:
-        if hasattr(shape, "top") and shape.top is not None and START_Y <= shape.top <= MAX_Y:
-            return True
-        # Check specifically for tables
-        if shape.has_table:
-            return True
-    return False
+from config import patients_folder as PF, generated_outputs as GO, lifeStyle_template as LT, BATCH_WORKERS
+from utils.slide_occupancy import find_empty_slides, drop_slides
+from utils.instrumentation import configure_instrumentation, patient_run, stage
+from utils.build_manifest import input_hashes, is_up_to_date, write_build_manifest, save_file_hashes
+from batch_runner import discover_patients, read_manifest, run_batch
+
+# Report steps in the order they run: (stage, module, function, message, enabled).
+# A step module, and with it pandas / openpyxl / python-pptx, is only imported once an enabled step runs.
+REPORT_STEPS = [
+    ("text_replacement", "text_changes.change_SequencingDetails", "replace_text_in_prs",
+     "📜 Text replacements done.", True),
+    ("parallelograms", "image_changes.parallelograms_imageChanges", "insert_parallelogram_images_in_prs",
+     "🖼️ Parallelogram images added.", True),
+    ("diet", "image_changes.diet_imageChanges", "add_diet_images_in_prs",
+     "🥗 Diet images added.", True),
+    ("vitamins", "text_changes.change_VitaminDetails", "update_vitamin_details_in_prs",
+     "💊 Vitamin details updated.", True),
+    ("risk", "image_changes.risk_imageChanges", "process_risk_images_in_prs",
+     "📊 Risk images processed.", True),
+    ("nutrition_fitness", "text_changes.change_Gender_NutritionFitness", "update_gender_nutrition_fitness_in_prs",
+     "🏋️ Gender-based nutrition & fitness details updated.", False),
+    ("intolerance", "image_changes.intolerance_imageChanges", "add_intolerance_details_in_prs",
+     "🔍 Intolerance details added.", True),
+]
+
+def load_step(module_name, function_name):
+    """Imports a step module on first use and returns its *_in_prs function."""
+    return getattr(importlib.import_module(module_name), function_name)
+
+def delete_empty_slides_in_prs(prs):
+    """Deletes all empty slides from an already loaded presentation, parts included."""
+    empty_slide_indexes = find_empty_slides(prs)
+
+    if empty_slide_indexes:
+        drop_slides(prs, empty_slide_indexes)
+        print(f"🗑️ Empty slides removed: {empty_slide_indexes}")
+    else:
+        print(f"✅ No empty slides found.")
+
+    return empty_slide_indexes
 
 def delete_empty_slides(output_ppt_path):
     """Deletes all empty slides in the PowerPoint if they have no images or textboxes."""
-    prs = Presentation(output_ppt_path)
-    empty_slide_indexes = [i for i in range(len(prs.slides)) if not has_content(prs.slides[i])]
+    from pptx import Presentation
 
+    prs = Presentation(output_ppt_path)
+    empty_slide_indexes = delete_empty_slides_in_prs(prs)
     if empty_slide_indexes:
-        for i in sorted(empty_slide_indexes, reverse=True):
-            xml_slides = prs.slides._sldIdLst
-            xml_slides.remove(xml_slides[i])
         prs.save(output_ppt_path)
-        print(f"🗑️ Empty slides removed: {empty_slide_indexes}")
-    else:
-        print(f"✅ No empty slides found.")
-    
     return empty_slide_indexes 
 
-def generate_patient_report(patient_code):
+def report_path(patient_code):
+    return os.path.join(GO, f"{patient_code}_report.pptx")
+
+def render_report(profile):
     """
-    Generates a PowerPoint report for a single patient.
+    Runs every step on a fresh clone of the cached template and returns the finished
+    Presentation without writing it anywhere.
     """
-    json_path = os.path.join(PF, patient_code, f"{patient_code}.json")
-    output_ppt_path = os.path.join(GO, f"{patient_code}_report.pptx")
+    from utils.template_cache import load_template
 
-    if not os.path.exists(json_path):
-        print(f"⚠️ JSON file not found for patient {patient_code}, skipping.")
-        return
-    
-    print(f"\n🚀 Generating report for: {patient_code}")
+    # Step 1: Clone the cached, pre-parsed template PPT
+    with stage("load_template"):
+        prs = load_template(LT)
 
-    # Step 1: Copy the actual template PPT to the output folder
-    copy_template_ppt(output_ppt_path)
+    # Steps 2-8: Text, images, vitamins, risk, nutrition & fitness (disabled) and intolerance
+    for stage_name, module_name, function_name, message, enabled in REPORT_STEPS:
+        if not enabled:
+            continue
+        step = load_step(module_name, function_name)
+        with stage(stage_name):
+            step(prs, profile)
+        print(message)
 
-    # Step 2: Process text replacement
-    replace_text_in_ppt(json_path, output_ppt_path, output_ppt_path)
-    print("📜 Text replacements done.")
+    # Step 9: Delete empty slides
+    with stage("delete_empty_slides"):
+        delete_empty_slides_in_prs(prs)
 
-    # Step 3: Insert parallelogram images
-    insert_parallelogram_images(patient_code)
-    print("🖼️ Parallelogram images added.")
+    return prs
 
-    # Step 4: Insert diet images
-    add_diet_images(output_ppt_path, patient_code)
-    print("🥗 Diet images added.")
+def generate_patient_report(patient_code, profile=None, inputs=None):
+    """
+    Generates a PowerPoint report for a single patient.
+    The template is parsed once, every step mutates the same Presentation
+    and the deck is written to disk exactly once at the end.
+    profile / inputs are the patient's inputs already parsed or read by a prefetch stage.
+    """
+    from utils.patient_profile import load_patient_profile
+    from utils.package_writer import save_presentation
 
-    # Step 5: Update vitamin details
-    update_vitamin_details(patient_code)
-    print("💊 Vitamin details updated.")
+    json_path = os.path.join(PF, patient_code, f"{patient_code}.json")
+    output_ppt_path = report_path(patient_code)
 
-    # Step 6: Process risk images
-    process_risk_images(patient_code, output_ppt_path)
-    print("📊 Risk images processed.")
+    has_json = profile is not None or (inputs is not None and "json" in inputs)
+    if not has_json and not os.path.exists(json_path):
+        print(f"⚠️ JSON file not found for patient {patient_code}, skipping.")
+        return
+    
+    print(f"\n🚀 Generating report for: {patient_code}")
 
-    # Step 7: Update gender-based nutrition and fitness details
-    # update_gender_nutrition_fitness(json_path, output_ppt_path)
-    # print("🏋️ Gender-based nutrition & fitness details updated.")
+    with patient_run(patient_code):
+        # Read every patient input once
+        with stage("load_profile"):
+            if profile is None:
+                profile = load_patient_profile(patient_code, inputs)
 
-    # Step 8: Add intolerance details
-    add_intolerance_details(patient_code)
-    print("🔍 Intolerance details added.")
+        prs = render_report(profile)
 
-    # Step 9: Delete empty slides
-    delete_empty_slides(output_ppt_path)
+        # Step 10: Stream the finished deck to its destination once, reusing the template's compressed parts
+        with stage("save"):
+            save_presentation(prs, output_ppt_path, LT)
 
     print(f"✅ Report completed: {output_ppt_path}\n")
+    return output_ppt_path
 
 
-def generate_reports():
+def generate_reports(patient_codes=None, workers=BATCH_WORKERS, force=False):
     """
-    Runs the report generation process sequentially for each selected patient.
+    Runs the report generation process for the given patients, or for every
+    patient found in the patients folder, on a pool of worker processes.
+    Reports whose inputs are unchanged since their last build are skipped unless force is set.
     """
-    for patient in selected_patients:
-        generate_patient_report(patient)
+    if patient_codes is None:
+        patient_codes = discover_patients()
+    patient_codes = list(dict.fromkeys(patient_codes))
+
+    # Hash every input up front; the manifest records these hashes once the report is built
+    inputs = {code: input_hashes(code) for code in patient_codes}
+    up_to_date = [] if force else [code for code in patient_codes
+                                   if is_up_to_date(code, report_path(code), inputs[code])]
+    save_file_hashes()
+    if up_to_date:
+        print(f"⏭️ {len(up_to_date)} report(s) up to date, skipped (use --force to rebuild)")
+
+    skipped = set(up_to_date)
+    stale = [code for code in patient_codes if code not in skipped]
+    results = run_batch(stale, workers=workers) if stale else []
+    for result in results:
+        if result["status"] == "ok":
+            write_build_manifest(result["patient"], result["output"], inputs[result["patient"]])
+
+    results_by_code = {result["patient"]: result for result in results}
+    for code in up_to_date:
+        results_by_code[code] = {"patient": code, "status": "up_to_date", "output": report_path(code),
+                                 "error": None, "seconds": 0.0}
+    return [results_by_code[code] for code in patient_codes]
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Generate lifestyle PowerPoint reports.")
+    parser.add_argument("patients", nargs="*", help="Patient codes to process (default: every patient in the patients folder)")
+    parser.add_argument("--manifest", help="File listing patient codes, one per line or first CSV column")
+    parser.add_argument("--workers", type=int, help="Number of worker processes (default: one per CPU core)")
+    parser.add_argument("--timings", help="Write per-stage timings to this .jsonl or .csv file")
+    parser.add_argument("--profile-dir", help="Write a cProfile dump of each patient's whole report into this folder")
+    parser.add_argument("--force", action="store_true", help="Rebuild every report even if its inputs are unchanged")
+    return parser.parse_args(argv)
+
+def cli(argv=None):
+    """Command-line entry point; nothing heavier than the standard library loads before a report is due."""
+    args = parse_args(argv)
+    if args.timings or args.profile_dir:
+        configure_instrumentation(args.timings, args.profile_dir)
+    patient_codes = list(args.patients)
+    if args.manifest:
+        patient_codes.extend(read_manifest(args.manifest))
+    return generate_reports(patient_codes or None, workers=args.workers or BATCH_WORKERS, force=args.force)
 
 # Execute the entire process
-generate_reports()
+if __name__ == "__main__":
+    cli()
@@ -0,0 +1,264 @@
+import argparse
+import io
+import json
+import os
+import socket
+import socketserver
+import threading
+import time
+import traceback
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+from config import (lifeStyle_template as LT, RECOMMENDATIONS_FILE, FIRST_TEXT_FILE, DIET_FILE, RDA_FILE,
+                    input_parallelograms, DIET_PICTURES, image_paths, IMAGE_CACHE_MAX_BYTES,
+                    SERVICE_HOST, SERVICE_PORT, SERVICE_MAX_CONCURRENCY, SERVICE_QUEUE_TIMEOUT)
+from main import render_report, report_path
+from utils.patient_inputs import read_patient_inputs
+from utils.patient_profile import load_patient_profile
+from utils.package_writer import save_presentation
+from utils.template_cache import load_template
+from utils.reference_data import get_bullet_points, get_cell_values, get_rda_index
+from utils.asset_index import warm_asset_index
+from utils.image_cache import get_image, image_cache_stats
+from utils.layout import text_width
+from utils.instrumentation import patient_run, stage
+
+PPTX_CONTENT_TYPE = "application/vnd.openxmlformats-officedocument.presentationml.presentation"
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg")
+
+class ServiceError(Exception):
+    """A request the service refuses, with the HTTP status to answer it with."""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+class ReportService:
+    """
+    Generates reports in a long-running process, so the template, reference workbooks,
+    asset listings and images stay parsed between requests.
+    At most max_concurrency reports render at once; later requests wait up to
+    queue_timeout seconds for a slot and are then turned away as busy.
+    """
+
+    def __init__(self, max_concurrency=SERVICE_MAX_CONCURRENCY, queue_timeout=SERVICE_QUEUE_TIMEOUT):
+        self.max_concurrency = max_concurrency
+        self.queue_timeout = queue_timeout
+        self._slots = threading.BoundedSemaphore(max_concurrency)
+        self._lock = threading.Lock()
+        self.started_at = time.time()
+        self.warm_seconds = None
+        self.metrics = {"requests": 0, "reports_ok": 0, "reports_failed": 0, "rejected_busy": 0,
+                        "in_flight": 0, "render_seconds_total": 0.0, "render_seconds_max": 0.0}
+
+    def warm_up(self):
+        """Parses the template and reference workbooks, lists the asset folders and loads images."""
+        start = time.perf_counter()
+        load_template(LT)
+        for path in (RECOMMENDATIONS_FILE, FIRST_TEXT_FILE, DIET_FILE):
+            if os.path.exists(path):
+                get_bullet_points(path, None, None)
+                get_cell_values(path, None, None)
+        if os.path.exists(RDA_FILE):
+            get_rda_index(RDA_FILE)
+        warm_asset_index()
+        text_width(" ", 9)
+
+        # Load images until the cache budget is used, thermometers first since every report has them
+        images = [path for path in image_paths.values() if os.path.exists(path)]
+        for root in (input_parallelograms, DIET_PICTURES):
+            for dirpath, _, filenames in os.walk(root):
+                images.extend(os.path.join(dirpath, name) for name in sorted(filenames)
+                              if name.lower().endswith(IMAGE_EXTENSIONS))
+        for path in images:
+            if image_cache_stats()[1] >= IMAGE_CACHE_MAX_BYTES:
+                break
+            get_image(path)
+
+        self.warm_seconds = round(time.perf_counter() - start, 3)
+        print(f"🔥 Caches warm in {self.warm_seconds} s ({image_cache_stats()[0]} images)")
+
+    def _count(self, name, value=1):
+        with self._lock:
+            self.metrics[name] += value
+
+    def generate(self, patient_code, data=None, intolerance=None):
+        """
+        Renders one report and returns the Presentation. data / intolerance replace the
+        patient's sequencing and intolerance JSON files; the other inputs are read from disk.
+        """
+        self._count("requests")
+        if not self._slots.acquire(timeout=self.queue_timeout):
+            self._count("rejected_busy")
+            raise ServiceError(503, f"All {self.max_concurrency} report slots are busy")
+
+        self._count("in_flight")
+        start = time.perf_counter()
+        try:
+            with patient_run(patient_code):
+                with stage("load_profile"):
+                    inputs = read_patient_inputs(patient_code)
+                    if data is not None:
+                        inputs["json"] = ("<request>", json.dumps(data).encode("utf-8"))
+                    if intolerance is not None:
+                        inputs["intolerance"] = ("<request>", json.dumps(intolerance).encode("utf-8"))
+                    if "json" not in inputs:
+                        raise ServiceError(404, f"JSON file not found for patient {patient_code}")
+                    profile = load_patient_profile(patient_code, inputs)
+                prs = render_report(profile)
+            self._count("reports_ok")
+            return prs
+        except ServiceError:
+            raise
+        except Exception:
+            self._count("reports_failed")
+            raise
+        finally:
+            seconds = time.perf_counter() - start
+            with self._lock:
+                self.metrics["in_flight"] -= 1
+                self.metrics["render_seconds_total"] += seconds
+                self.metrics["render_seconds_max"] = max(self.metrics["render_seconds_max"], seconds)
+            self._slots.release()
+
+    def health(self):
+        return {"status": "ok" if self.warm_seconds is not None else "warming",
+                "uptime_s": round(time.time() - self.started_at, 1),
+                "warm_s": self.warm_seconds}
+
+    def snapshot(self):
+        with self._lock:
+            metrics = dict(self.metrics)
+        finished = metrics["reports_ok"] + metrics["reports_failed"]
+        metrics["render_seconds_mean"] = round(metrics["render_seconds_total"] / finished, 4) if finished else None
+        metrics["max_concurrency"] = self.max_concurrency
+        metrics["cached_images"], metrics["cached_image_bytes"] = image_cache_stats()
+        return metrics
+
+class ReportRequestHandler(BaseHTTPRequestHandler):
+    """
+    GET  /health   -> service status
+    GET  /metrics  -> request counters, render times and cache sizes
+    POST /reports  -> {"patient": code, "data": {...}?, "intolerance": {...}?}
+                      answers with the .pptx bytes, or with the saved path when ?output=path
+    """
+
+    server_version = "LifestyleReportService/1.0"
+
+    def address_string(self):
+        # Unix-socket peers have no (host, port) address
+        return self.client_address[0] if isinstance(self.client_address, tuple) else "unix"
+
+    def _send(self, status, body, content_type="application/json", headers=None):
+        if not isinstance(body, bytes):
+            body = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        path = urlparse(self.path).path
+        if path == "/health":
+            self._send(200, self.server.service.health())
+        elif path == "/metrics":
+            self._send(200, self.server.service.snapshot())
+        else:
+            self._send(404, {"error": f"Unknown endpoint {path}"})
+
+    def do_POST(self):
+        url = urlparse(self.path)
+        if url.path != "/reports":
+            self._send(404, {"error": f"Unknown endpoint {url.path}"})
+            return
+        output = parse_qs(url.query).get("output", ["bytes"])[0]
+        try:
+            length = int(self.headers.get("Content-Length") or 0)
+            try:
+                payload = json.loads(self.rfile.read(length) or b"{}")
+            except ValueError:
+                raise ServiceError(400, "Request body is not valid JSON")
+            if not isinstance(payload, dict):
+                raise ServiceError(400, "Request body must be a JSON object")
+            patient_code = payload.get("patient")
+            if (not isinstance(patient_code, str) or not patient_code or patient_code in (".", "..")
+                    or os.path.basename(patient_code) != patient_code):
+                raise ServiceError(400, "A 'patient' code is required")
+            for name in ("data", "intolerance"):
+                if payload.get(name) is not None and not isinstance(payload[name], dict):
+                    raise ServiceError(400, f"'{name}' must be a JSON object")
+            if output not in ("bytes", "path"):
+                raise ServiceError(400, "output must be 'bytes' or 'path'")
+
+            start = time.perf_counter()
+            prs = self.server.service.generate(patient_code, payload.get("data"), payload.get("intolerance"))
+            if output == "path":
+                output_path = report_path(patient_code)
+                with stage("save", patient_code):
+                    save_presentation(prs, output_path, LT)
+                self._send(200, {"patient": patient_code, "output": output_path,
+                                 "seconds": round(time.perf_counter() - start, 3)})
+            else:
+                buffer = io.BytesIO()
+                with stage("save", patient_code):
+                    save_presentation(prs, buffer, LT)
+                self._send(200, buffer.getvalue(), PPTX_CONTENT_TYPE,
+                           {"Content-Disposition": f'attachment; filename="{patient_code}_report.pptx"'})
+        except ServiceError as exc:
+            self._send(exc.status, {"error": str(exc)})
+        except Exception as exc:
+            traceback.print_exc()
+            self._send(500, {"error": f"{type(exc).__name__}: {exc}"})
+
+class ReportHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, service):
+        super().__init__(address, ReportRequestHandler)
+        self.service = service
+
+if hasattr(socket, "AF_UNIX"):
+    class ReportUnixServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+        daemon_threads = True
+
+        def __init__(self, socket_path, service):
+            if os.path.exists(socket_path):
+                os.remove(socket_path)
+            super().__init__(socket_path, ReportRequestHandler)
+            self.service = service
+
+def serve(host=SERVICE_HOST, port=SERVICE_PORT, socket_path=None, max_concurrency=SERVICE_MAX_CONCURRENCY):
+    """Warms the caches, then serves report requests until interrupted."""
+    service = ReportService(max_concurrency)
+    service.warm_up()
+    if socket_path:
+        if not hasattr(socket, "AF_UNIX"):
+            raise SystemExit("❌ Unix sockets are not available on this platform, use --port")
+        server = ReportUnixServer(socket_path, service)
+        print(f"🛰️ Report service listening on {socket_path}")
+    else:
+        server = ReportHTTPServer((host, port), service)
+        print(f"🛰️ Report service listening on http://{host}:{server.server_address[1]}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return service
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Serve lifestyle reports from a warm, long-running process.")
+    parser.add_argument("--host", default=SERVICE_HOST, help="Interface to listen on")
+    parser.add_argument("--port", type=int, default=SERVICE_PORT, help="TCP port to listen on")
+    parser.add_argument("--socket", help="Listen on this Unix socket instead of TCP")
+    parser.add_argument("--max-concurrency", type=int, default=SERVICE_MAX_CONCURRENCY,
+                        help="Reports rendered at the same time; further requests queue")
+    return parser.parse_args(argv)
+
+if __name__ == "__main__":
+    args = parse_args()
+    serve(args.host, args.port, args.socket, args.max_concurrency)
@@ -0,0 +1,41 @@
+import os
+import pstats
+import subprocess
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Config values are copied when the step modules are imported, so the report runs in a fresh interpreter
+REPORT_SCRIPT = """
+import sys
+from benchmarks.synthetic_data import generate_synthetic_data
+from batch_runner import apply_config_overrides
+from utils.instrumentation import configure_instrumentation
+
+root, timings, profile_dir = sys.argv[1:4]
+overrides, codes = generate_synthetic_data(root, 1)
+apply_config_overrides(overrides)
+configure_instrumentation(timings, profile_dir)
+
+from main import generate_patient_report
+output = generate_patient_report(codes[0])
+print("REPORT", codes[0], output, sep="\t")
+"""
+
+def test_report_with_profile_dir(tmp_path):
+    pytest.importorskip("pandas")  # The synthetic data set is written with pandas
+    profile_dir = tmp_path / "profiles"
+    result = subprocess.run(
+        [sys.executable, "-c", REPORT_SCRIPT, str(tmp_path / "data"), str(tmp_path / "timings.jsonl"), str(profile_dir)],
+        cwd=ROOT, capture_output=True, text=True, encoding="utf-8",
+    )
+    assert result.returncode == 0, result.stderr
+    code, output = next(line.split("\t")[1:] for line in result.stdout.splitlines() if line.startswith("REPORT\t"))
+    assert os.path.exists(output)
+
+    # One dump for the whole report, holding the nested stages' work
+    assert os.listdir(profile_dir) == [f"{code}_total.prof"]
+    functions = {name for _, _, name in pstats.Stats(str(profile_dir / f"{code}_total.prof")).stats}
+    assert {"render_report", "load_patient_profile", "save_presentation"} <= functions
@@ -0,0 +1,54 @@
+import os
+import sys
+
+import pytest
+
+# Allow running as `python -m pytest` from the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import openpyxl
+from utils.reference_data import RdaIndex
+from utils.excel_reader import read_table
+
+pd = pytest.importorskip("pandas")
+
+CONDITIONS = ["Iron", "Zinc", "Calcium", "Folate"]
+
+COLUMNS = {
+    "Male (mg/day)": [8, 11, None, 400],               # Integers with a blank
+    "Female (mg/day)": [18, 8, 1000, 400],              # Integers only
+    "Child (mg/day)": [7.5, 3, None, 150],              # A decimal and a blank
+    "Note": ["with food", None, "split doses", None],   # Text with blanks
+    "Upper (mg/day)": [None, None, None, None],         # Nothing filled in
+}
+
+@pytest.fixture
+def rda_workbook(tmp_path):
+    path = tmp_path / "RDA.xlsx"
+    workbook = openpyxl.Workbook()
+    sheet = workbook.active
+    sheet.append(["Nutrient"] + list(COLUMNS))
+    for row, nutrient in enumerate(CONDITIONS):
+        sheet.append([f"{nutrient} (elemental)"] + [values[row] for values in COLUMNS.values()])
+    workbook.save(path)
+    return str(path)
+
+def pandas_label(rda_df, condition, rda_column):
+    """The label as the vitamin step built it with pandas."""
+    rda_match = rda_df[rda_df['Nutrient'].str.contains(fr'\b{condition}\b', case=False, na=False, regex=True)]
+    if rda_match.empty:
+        return condition
+    return f"{condition} ({rda_match.iloc[0][rda_column]})"
+
+@pytest.mark.parametrize("rda_column", list(COLUMNS))
+def test_rda_labels_match_pandas(rda_workbook, rda_column):
+    rda_df = pd.read_excel(rda_workbook)
+    index = RdaIndex(read_table(rda_workbook))
+    for condition in CONDITIONS + ["Vitamin K"]:
+        assert index.label(condition, rda_column) == pandas_label(rda_df, condition, rda_column)
+
+def test_integer_column_with_blank_prints_as_decimal(rda_workbook):
+    index = RdaIndex(read_table(rda_workbook))
+    assert index.label("Iron", "Male (mg/day)") == "Iron (8.0)"
+    assert index.label("Calcium", "Male (mg/day)") == "Calcium (nan)"
+    assert index.label("Iron", "Female (mg/day)") == "Iron (18)"
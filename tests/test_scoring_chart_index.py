@@ -0,0 +1,63 @@
+import os
+import sys
+
+# Allow running as `python -m pytest` from the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.scoring_chart_index import _empty_index, refresh_index
+
+PATIENTS = ["PAT1", "PAT2", "PAT3"]
+
+def walk_lookup(root, patient_id):
+    """The lookup the steps used before the index: the first chart a top-down os.walk finds."""
+    for dirpath, _, files in os.walk(root):
+        for file in files:
+            if file.startswith(f"{patient_id}_Scoring_chart") and file.endswith(".xlsx"):
+                return os.path.join(dirpath, file)
+    return None
+
+def add_chart(root, folder, patient_id):
+    path = os.path.join(root, folder, f"{patient_id}_Scoring_chart.xlsx")
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    open(path, "wb").close()
+    return path
+
+def indexed(index, patient_id):
+    entry = index["charts"].get(patient_id)
+    return entry[0] if entry else None
+
+def assert_matches_walk(root, index):
+    for patient_id in PATIENTS:
+        assert indexed(index, patient_id) == walk_lookup(root, patient_id), patient_id
+
+def test_first_scan_keeps_the_chart_os_walk_finds_first(tmp_path):
+    root = str(tmp_path)
+    for folder in ("BATCH1", "BATCH2", os.path.join("BATCH1", "late"), "BATCH3"):
+        for patient_id in PATIENTS[:2]:
+            add_chart(root, folder, patient_id)
+    add_chart(root, "BATCH3", "PAT3")
+    add_chart(root, os.path.join("BATCH2", "nested"), "PAT3")
+
+    index = _empty_index(root)
+    refresh_index(index)
+    assert_matches_walk(root, index)
+
+def test_incremental_refresh_keeps_walk_order(tmp_path):
+    root = str(tmp_path)
+    add_chart(root, "BATCH2", "PAT1")
+    add_chart(root, "BATCH2", "PAT2")
+    index = _empty_index(root)
+    refresh_index(index)
+
+    # A chart that os.walk meets earlier than the indexed one, e.g. in a folder it lists first
+    add_chart(root, "BATCH2", "PAT3")
+    for folder in os.listdir(root):
+        add_chart(root, folder + "_copy", "PAT1")
+    refresh_index(index)
+    assert_matches_walk(root, index)
+
+    # Removing the indexed chart falls back to the next one os.walk finds, even in an unchanged folder
+    os.remove(indexed(index, "PAT1"))
+    refresh_index(index)
+    assert_matches_walk(root, index)
+    assert indexed(index, "PAT1") is not None
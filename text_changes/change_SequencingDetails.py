@@ -1,7 +1,8 @@
 import json
 import re
 from pptx import Presentation
-from pptx_replace import replace_text  # Using pptx-replace
+from utils.placeholders import fill_placeholders
+from utils.patient_profile import PatientProfile
 
 def normalize_keys(json_data):
     """
@@ -10,6 +11,24 @@ def normalize_keys(json_data):
     return {re.sub(r'\s+', '_', k): v for k, v in json_data.items()}
 
 
+def replace_text_in_prs(prs, profile):
+    """
+    Replaces placeholders in an already loaded presentation with the patient's JSON values.
+    """
+    # Normalize JSON keys
+    formatted_data = normalize_keys(profile.data)
+
+    # Replace every placeholder in one pass over the slides
+    unknown, unfilled = fill_placeholders(prs, formatted_data)
+    if unfilled:
+        print(f"⚠️ Placeholders without a JSON value: {unfilled}")
+    if unknown:
+        print(f"ℹ️ JSON keys without a placeholder: {unknown}")
+
+    print("✅ Added Patient Sequencing Details")
+    return True
+
+
 def replace_text_in_ppt(json_path, ppt_template_path, output_path):
     """
     Reads JSON, replaces placeholders in the PPT, and saves the modified file.
@@ -18,15 +37,7 @@ def replace_text_in_ppt(json_path, ppt_template_path, output_path):
         data = json.load(f)
 
     prs = Presentation(ppt_template_path)
-
-    # Normalize JSON keys
-    formatted_data = normalize_keys(data)
-
-    # Replace text in slides
-    for key, value in formatted_data.items():
-        replace_text(prs, f"{{{key}}}", str(value))
+    replace_text_in_prs(prs, PatientProfile(data=data))
 
     # Save modified presentation
     prs.save(output_path)
-
-    print("✅ Added Patient Sequencing Details")
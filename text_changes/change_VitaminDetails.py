@@ -1,9 +1,12 @@
-import os, json
+import os
 from pptx import Presentation
 from pptx.util import Cm, Pt
-import openpyxl
-from config import GENERATED_OUTPUTS, patients_folder as PF, RDA_FILE
-import pandas as pd
+from config import GENERATED_OUTPUTS, RDA_FILE
+from utils.patient_profile import load_patient_profile
+from utils.reference_data import get_rda_index
+from utils.layout import fit_paragraphs
+from utils.slide_occupancy import mark_occupied
+from utils.rich_text import set_text_defaults, write_lines
 
 # Define text box parameters for each Risk level
 TEXT_BOX_PARAMS_RISK = {
@@ -21,22 +24,20 @@ TEXT_BOX_PARAMS_RISK = {
     ]
 }
 
-def add_text_boxes_on_slide(prs, slide_index, patient_code):
-    VITAMIN_SHEET_FILE = os.path.join(PF, patient_code, f"{patient_code}_vitamin_sheet.xlsx")
-    JSON_PATH = os.path.join(PF, patient_code, f"{patient_code}.json")
+BULLET_FONT_SIZE = 11
+BULLET_SPACE_AFTER = Cm(0.1)
 
-    if not os.path.exists(VITAMIN_SHEET_FILE) or not os.path.exists(RDA_FILE) or not os.path.exists(JSON_PATH):
-        print(f"❌ Required files not found for patient {patient_code}")
+def add_text_boxes_on_slide(prs, slide_index, profile):
+    if profile.vitamin_sheet is None or not os.path.exists(RDA_FILE) or not profile.data:
+        print(f"❌ Required files not found for patient {profile.patient_code}")
         return False
 
-    # Read the Excel files and JSON
-    df = pd.read_excel(VITAMIN_SHEET_FILE)
-    rda_df = pd.read_excel(RDA_FILE)
+    # The vitamin sheet and JSON come from the profile; the RDA sheet is compiled once per process
+    sheet = profile.vitamin_sheet
+    rda_index = get_rda_index(RDA_FILE)
     
     # Get patient gender from JSON
-    with open(JSON_PATH, 'r') as file:
-        json_data = json.load(file)
-    json_data = {k.lower(): v for k, v in json_data.items()}
+    json_data = {k.lower(): v for k, v in profile.data.items()}
     gender = json_data.get("gender", "Female")  # Default to Female if not found
     rda_column = 'Female (mg/day)' if gender.lower() == 'female' else 'Male (mg/day)'
 
@@ -44,43 +45,27 @@ def add_text_boxes_on_slide(prs, slide_index, patient_code):
     risk_dict = {3: [], 2: [], 1: []}
     risk_columns_dict = {3: set(), 2: set(), 1: set()}
 
-    # Process the data
-    for _, row in df.iterrows():
-        risk_level = row['Risk']
+    # Join the vitamin sheet to the RDA index: "Condition (RDA value)" when the nutrient is known
+    for condition, risk_level in zip(sheet.column('Condition'), sheet.column('Risk')):
         if risk_level in risk_dict:
-            condition = row['Condition']
-            # Find matching nutrient in RDA file
-            rda_match = rda_df[rda_df['Nutrient'].str.contains(fr'\b{condition}\b', case=False, na=False, regex=True)]
-            if not rda_match.empty:
-                rda_value = rda_match.iloc[0][rda_column]
-                condition_with_rda = f"{condition} ({rda_value})"
-                risk_dict[risk_level].append(condition_with_rda)
-            else:
-                risk_dict[risk_level].append(condition)
+            risk_dict[risk_level].append(rda_index.label(condition, rda_column))
 
     # Convert sets to sorted lists for consistent ordering
     risk_columns_dict = {k: sorted(v) for k, v in risk_columns_dict.items()}
 
     # Get the specified slide
     slide = prs.slides[slide_index]
+    mark_occupied(slide)
 
     # Function to add text to a text box with bullet points
     def add_bullet_points(text_box, items, font_name, font_size, bold=False):
         text_frame = text_box.text_frame
         text_frame.clear()  # Clear any existing text
+        text_frame.word_wrap = True  # Wrap long labels inside the column, as measured by the layout
 
-        for idx, item in enumerate(items):
-            if idx == 0:
-                # Use the default paragraph for the first bullet point
-                p = text_frame.paragraphs[0]
-            else:
-                # Add a new paragraph for subsequent bullet points
-                p = text_frame.add_paragraph()
-            p.text = item
-            p.font.name = font_name
-            p.font.size = font_size
-            p.font.bold = bold
-            p.space_after = Cm(0.1)  # Adjust spacing between bullet points
+        # Font and spacing between bullet points are set once for the whole box
+        set_text_defaults(text_frame, font_name, font_size, bold, BULLET_SPACE_AFTER)
+        write_lines(text_frame, items)
 
     # Function to add wrapped text to a text box with specific line formatting
     def add_wrapped_text_with_lines(text_box, items, items_per_line, font_name, font_size, bold=False, italic=False):
@@ -107,18 +92,11 @@ def add_text_boxes_on_slide(prs, slide_index, patient_code):
         conditions = risk_dict[risk]
         risk_columns = risk_columns_dict[risk]
 
-        # Split conditions into two lists for the first and second text boxes
-        conditions_text_1 = []
-        conditions_text_2 = []
-        current_height = 0
-        max_height = Cm(4)  # Approximate height limit for the first text box
-
-        for condition in conditions:
-            if current_height + Cm(0.5) <= max_height:  # Approximate height per bullet point
-                conditions_text_1.append(condition)
-                current_height += Cm(0.5)
-            else:
-                conditions_text_2.append(condition)
+        # Fill the first text box with as many bullets as its measured text fits, the rest go to the second
+        box_height, box_width = params[0][0], params[0][1]
+        split = fit_paragraphs(conditions, box_width, box_height, BULLET_FONT_SIZE, bold=True, space_after=BULLET_SPACE_AFTER)
+        conditions_text_1 = conditions[:split]
+        conditions_text_2 = conditions[split:]
 
         # Determine items per line for the third box based on risk level
         items_per_line = 3 if risk == 3 else 2
@@ -130,7 +108,7 @@ def add_text_boxes_on_slide(prs, slide_index, patient_code):
                     text_box,
                     conditions_text_1,
                     font_name="Arial",
-                    font_size=Pt(11),
+                    font_size=Pt(BULLET_FONT_SIZE),
                     bold=True
                 )
             elif i == 1:  # Second box
@@ -138,19 +116,22 @@ def add_text_boxes_on_slide(prs, slide_index, patient_code):
                     text_box,
                     conditions_text_2,
                     font_name="Arial",
-                    font_size=Pt(11),
+                    font_size=Pt(BULLET_FONT_SIZE),
                     bold=True
                 )
 
+    return True
+
+def update_vitamin_details_in_prs(prs, profile):
+    """Adds the vitamin text boxes to an already loaded presentation."""
+    if add_text_boxes_on_slide(prs, slide_index=38, profile=profile):  # Add to the 39th slide (index 38)
+        print(f"✅ Vitamin details updated for patient {profile.patient_code}")
+        return True
+    return False
+
 def update_vitamin_details(patient_id):
     ppt_path = os.path.join(GENERATED_OUTPUTS, f"{patient_id}_report.pptx")
 
     prs = Presentation(ppt_path)
-    if add_text_boxes_on_slide(prs, slide_index=38, patient_code=patient_id):  # Add to the 39th slide (index 38)
+    if update_vitamin_details_in_prs(prs, load_patient_profile(patient_id)):
         prs.save(ppt_path)
-        print(f"✅ Vitamin details updated for patient {patient_id}")
-
-    prs = Presentation(ppt_path)
-    add_text_boxes_on_slide(prs, slide_index=38, patient_code=patient_id)  # Add to the 39th slide (index 38)
-    prs.save(ppt_path)
-    print(f"✅ Vitamin details updated for patient {patient_id}")
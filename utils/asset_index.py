@@ -0,0 +1,83 @@
+import os
+import threading
+import time
+from config import DIET_PICTURES, input_parallelograms
+
+# Seconds between mtime checks of an indexed folder, so lookups don't stat the share per card
+STAT_INTERVAL = 2.0
+
+# folder -> {"mtime", "checked_at", "names", "matches"}
+_FOLDERS = {}
+_REPORTED_AMBIGUOUS = set()
+_LOCK = threading.Lock()
+
+def _folder_mtime(folder):
+    try:
+        return os.stat(folder).st_mtime_ns
+    except OSError:
+        return None
+
+def _list_folder(folder, mtime):
+    names = os.listdir(folder) if mtime is not None else []
+    return {"mtime": mtime, "checked_at": time.monotonic(), "names": names, "matches": {}}
+
+def _get_folder(folder):
+    """Returns the cached listing of a folder, listing it again only when its mtime changed."""
+    entry = _FOLDERS.get(folder)
+    now = time.monotonic()
+    if entry is not None and now - entry["checked_at"] < STAT_INTERVAL:
+        return entry
+    mtime = _folder_mtime(folder)
+    if entry is None or entry["mtime"] != mtime:
+        entry = _list_folder(folder, mtime)
+        _FOLDERS[folder] = entry
+    else:
+        entry["checked_at"] = now
+    return entry
+
+def contains_rule(condition, name):
+    """Diet pictures: the condition appears anywhere in the file name."""
+    return condition.lower() in name.lower()
+
+def prefix_png_rule(condition, name):
+    """Parallelograms: the file name starts with the condition and is a .png."""
+    return name.lower().startswith(condition.lower()) and name.endswith(".png")
+
+def find_asset(folder, condition, rule):
+    """
+    Returns the first file in folder (in directory listing order, as os.listdir did)
+    that matches the condition under rule, or None. Ambiguous matches are reported once.
+    """
+    with _LOCK:
+        entry = _get_folder(folder)
+        key = (condition, rule.__name__)
+        if key in entry["matches"]:
+            return entry["matches"][key]
+
+        candidates = [name for name in entry["names"] if rule(condition, name)]
+        path = os.path.join(folder, candidates[0]) if candidates else None
+        entry["matches"][key] = path
+
+        if len(candidates) > 1 and (folder, key) not in _REPORTED_AMBIGUOUS:
+            _REPORTED_AMBIGUOUS.add((folder, key))
+            print(f"⚠️ {len(candidates)} images match '{condition}' in {folder}: {candidates}, using {candidates[0]}")
+        return path
+
+def find_diet_image(condition, severity_folder):
+    return find_asset(os.path.join(DIET_PICTURES, severity_folder), condition, contains_rule)
+
+def find_parallelogram_image(severity, condition):
+    return find_asset(os.path.join(input_parallelograms, severity), condition, prefix_png_rule)
+
+def warm_asset_index():
+    """Lists every severity folder under the diet and parallelogram roots up front."""
+    count = 0
+    with _LOCK:
+        for root in (DIET_PICTURES, input_parallelograms):
+            if not os.path.isdir(root):
+                continue
+            for name in os.listdir(root):
+                folder = os.path.join(root, name)
+                if os.path.isdir(folder):
+                    count += len(_get_folder(folder)["names"])
+    return count
@@ -0,0 +1,168 @@
+import hashlib
+import json
+import os
+import threading
+from config import (BUILD_MANIFEST_DIR, lifeStyle_template, RECOMMENDATIONS_FILE, FIRST_TEXT_FILE, DIET_FILE,
+                    RDA_FILE, MALE_FITNESS_EXCELL, FEMALE_FITNESS_EXCELL, input_parallelograms, DIET_PICTURES,
+                    image_paths, ARIAL_FONT, ARIAL_BOLD_FONT)
+import config
+from utils.patient_inputs import patient_input_paths
+
+MANIFEST_VERSION = 1
+HASH_CACHE_NAME = "_file_hashes.json"
+CHUNK_SIZE = 1024 * 1024
+
+# Folders whose .py files decide what a report looks like; editing them makes every report stale
+CODE_DIRS = ["image_changes", "text_changes", "utils"]
+CODE_FILES = ["main.py"]
+
+# path -> [mtime_ns, size, sha256], persisted so unchanged files are not read again on the next run
+_FILE_HASHES = None
+_SHARED_INPUTS = None
+_LOCK = threading.Lock()
+
+def _hash_cache_path():
+    return os.path.join(BUILD_MANIFEST_DIR, HASH_CACHE_NAME)
+
+def _load_file_hashes():
+    global _FILE_HASHES
+    if _FILE_HASHES is None:
+        _FILE_HASHES = {}
+        try:
+            with open(_hash_cache_path(), "r", encoding="utf-8") as f:
+                _FILE_HASHES = json.load(f)
+        except (OSError, ValueError):
+            pass
+    return _FILE_HASHES
+
+def _write_json(path, data):
+    """Writes next to the final location first so readers never see a partial file."""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=1)
+    os.replace(tmp_path, path)
+
+def hash_file(path):
+    """
+    Returns the sha256 of a file's content, or None when it doesn't exist.
+    A file whose mtime and size match the last hashing is not read again.
+    """
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    hashes = _load_file_hashes()
+    entry = hashes.get(path)
+    if entry and entry[0] == stat.st_mtime_ns and entry[1] == stat.st_size:
+        return entry[2]
+
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+            digest.update(chunk)
+    hashes[path] = [stat.st_mtime_ns, stat.st_size, digest.hexdigest()]
+    return hashes[path][2]
+
+def hash_folder(folder, extensions=None):
+    """Returns one sha256 over the relative names and content hashes of every file under a folder."""
+    if not os.path.isdir(folder):
+        return None
+    digest = hashlib.sha256()
+    for dirpath, dirnames, filenames in os.walk(folder):
+        dirnames.sort()
+        for name in sorted(filenames):
+            if extensions and not name.lower().endswith(extensions):
+                continue
+            path = os.path.join(dirpath, name)
+            relative = os.path.relpath(path, folder).replace(os.sep, "/")
+            digest.update(f"{relative}\0{hash_file(path)}\n".encode("utf-8"))
+    return digest.hexdigest()
+
+def _code_hash():
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    digest = hashlib.sha256()
+    for name in CODE_FILES:
+        digest.update(f"{name}\0{hash_file(os.path.join(root, name))}\n".encode("utf-8"))
+    for folder in CODE_DIRS:
+        digest.update(f"{folder}\0{hash_folder(os.path.join(root, folder), ('.py',))}\n".encode("utf-8"))
+    return digest.hexdigest()
+
+def shared_input_hashes():
+    """Hashes of the inputs every report shares (template, workbooks, asset folders, fonts, code), once per process."""
+    global _SHARED_INPUTS
+    with _LOCK:
+        if _SHARED_INPUTS is None:
+            inputs = {
+                "template": hash_file(lifeStyle_template),
+                "recommendations": hash_file(RECOMMENDATIONS_FILE),
+                "first_text": hash_file(FIRST_TEXT_FILE),
+                "diet": hash_file(DIET_FILE),
+                "rda": hash_file(RDA_FILE),
+                "male_fitness": hash_file(MALE_FITNESS_EXCELL),
+                "female_fitness": hash_file(FEMALE_FITNESS_EXCELL),
+                "parallelograms": hash_folder(input_parallelograms),
+                "diet_pictures": hash_folder(DIET_PICTURES),
+                "font": hash_file(ARIAL_FONT),
+                "bold_font": hash_file(ARIAL_BOLD_FONT),
+                "code": _code_hash(),
+            }
+            for key, path in sorted(image_paths.items()):
+                inputs[f"thermometer:{key}"] = hash_file(path)
+            _SHARED_INPUTS = inputs
+        # Pictures are embedded at this resolution; read on every call so a runtime override counts
+        return dict(_SHARED_INPUTS, image_dpi=config.IMAGE_TARGET_DPI)
+
+def input_hashes(patient_code):
+    """Returns the content hash of every input that feeds a patient's report (None for a missing one)."""
+    inputs = {f"patient:{name}": hash_file(path) if path else None
+              for name, path in patient_input_paths(patient_code).items()}
+    inputs.update(shared_input_hashes())
+    return inputs
+
+def _digest(inputs):
+    return hashlib.sha256(json.dumps(inputs, sort_keys=True).encode("utf-8")).hexdigest()
+
+def _manifest_path(patient_code):
+    return os.path.join(BUILD_MANIFEST_DIR, f"{patient_code}.json")
+
+def _read_manifest(patient_code):
+    try:
+        with open(_manifest_path(patient_code), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def is_up_to_date(patient_code, output_path, inputs):
+    """
+    True when the report exists, is the file the last build wrote, and was built
+    from inputs with exactly these hashes.
+    """
+    manifest = _read_manifest(patient_code)
+    if not manifest or manifest.get("version") != MANIFEST_VERSION:
+        return False
+    try:
+        stat = os.stat(output_path)
+    except OSError:
+        return False
+    return (manifest.get("digest") == _digest(inputs)
+            and manifest.get("output") == output_path
+            and manifest.get("output_stat") == [stat.st_mtime_ns, stat.st_size])
+
+def write_build_manifest(patient_code, output_path, inputs):
+    """Records the inputs a report was built from, next to the report's own size and mtime."""
+    stat = os.stat(output_path)
+    _write_json(_manifest_path(patient_code), {
+        "version": MANIFEST_VERSION,
+        "patient": patient_code,
+        "output": output_path,
+        "output_stat": [stat.st_mtime_ns, stat.st_size],
+        "digest": _digest(inputs),
+        "inputs": inputs,
+    })
+
+def save_file_hashes():
+    """Persists the file hash cache so the next run only reads files that changed."""
+    with _LOCK:
+        if _FILE_HASHES:
+            _write_json(_hash_cache_path(), _FILE_HASHES)
@@ -0,0 +1,88 @@
+import copy
+import threading
+from pptx.oxml.ns import qn
+from config import lifeStyle_template
+from utils.image_cache import get_or_add_image_part
+from utils.instrumentation import count_event
+from utils.template_cache import get_template_package
+
+# (module, condition, severity, template version) -> CardFragment
+_FRAGMENTS = {}
+_LOCK = threading.Lock()
+
+class CardFragment:
+    """
+    The shape XML of one placed card, with offsets relative to the card's origin.
+    inputs are the text and image the shapes were built from, so a changed reference
+    workbook or picture rebuilds the card instead of reusing stale shapes.
+    """
+
+    def __init__(self, inputs, elements, image_paths):
+        self.inputs = inputs
+        self.elements = elements
+        self.image_paths = image_paths
+
+def template_version(path=lifeStyle_template):
+    """The signature of the template the cards are placed on, the version part of a fragment key."""
+    return get_template_package(path)[0]
+
+def _offsets(element):
+    return element.xpath("./p:spPr/a:xfrm/a:off | ./p:xfrm/a:off")
+
+def _capture(elements, x, y):
+    """Deep-copies freshly built shapes and makes their offsets relative to (x, y)."""
+    captured = []
+    for element in elements:
+        element = copy.deepcopy(element)
+        for off in _offsets(element):
+            off.set("x", str(int(off.get("x")) - x))
+            off.set("y", str(int(off.get("y")) - y))
+        captured.append(element)
+    return captured
+
+def _clone(slide, fragment, x, y):
+    """Appends a copy of the fragment to the slide at (x, y) with fresh shape ids and image relationships."""
+    sp_tree = slide.shapes._spTree
+    with _LOCK:
+        elements = [copy.deepcopy(element) for element in fragment.elements]
+    image_paths = iter(fragment.image_paths)
+    next_id = sp_tree.max_shape_id + 1
+    for element in elements:
+        for off in _offsets(element):
+            off.set("x", str(int(off.get("x")) + x))
+            off.set("y", str(int(off.get("y")) + y))
+        # Same id and "<kind> <id - 1>" name python-pptx gives a shape it adds
+        c_nv_pr = element.xpath("./*[1]/p:cNvPr")[0]
+        c_nv_pr.set("id", str(next_id))
+        c_nv_pr.set("name", f"{c_nv_pr.get('name').rsplit(' ', 1)[0]} {next_id - 1}")
+        next_id += 1
+        for blip in element.xpath(".//a:blip[@r:embed]"):
+            count_event("add_picture")
+            ext = element.xpath("./p:spPr/a:xfrm/a:ext")[0]
+            _, rId = get_or_add_image_part(slide, next(image_paths), int(ext.get("cx")), int(ext.get("cy")))
+            blip.set(qn("r:embed"), rId)
+        sp_tree.insert_element_before(element, "p:extLst")
+
+def place_card(slide, x, y, key, inputs, image_paths, build):
+    """
+    Places a card whose top-left corner is (x, y). The first placement of a key runs
+    build(slide, x, y), which adds the card's shapes through python-pptx; those shapes are
+    kept as a fragment, and later placements of the key only copy it and set offsets,
+    shape ids and picture relationships. image_paths lists the card's pictures in shape order.
+    """
+    with _LOCK:
+        fragment = _FRAGMENTS.get(key)
+    if fragment is not None and fragment.inputs == inputs and fragment.image_paths == image_paths:
+        _clone(slide, fragment, x, y)
+        return
+
+    sp_tree = slide.shapes._spTree
+    existing = set(sp_tree)
+    build(slide, x, y)
+    fragment = CardFragment(inputs, _capture([e for e in sp_tree if e not in existing], x, y), image_paths)
+    with _LOCK:
+        _FRAGMENTS[key] = fragment
+
+def clear_card_fragments():
+    with _LOCK:
+        _FRAGMENTS.clear()
@@ -0,0 +1,95 @@
+import re
+from collections import namedtuple
+import openpyxl
+from utils.instrumentation import count_event
+
+# Cell texts read as missing, the same placeholders pd.read_excel treated as NaN
+NA_VALUES = frozenset([
+    "", "#N/A", "#N/A N/A", "#NA", "-1.#IND", "-1.#QNAN", "-NaN", "-nan", "1.#IND", "1.#QNAN",
+    "<NA>", "N/A", "NA", "NULL", "NaN", "None", "n/a", "nan", "null",
+])
+
+def _clean(value):
+    if isinstance(value, str) and value in NA_VALUES:
+        return None
+    return value
+
+def _header_names(cells):
+    """Names the columns like pandas did: blanks become 'Unnamed: i', repeats get '.1', '.2', ..."""
+    names = []
+    seen = {}
+    for i, cell in enumerate(cells):
+        name = f"Unnamed: {i}" if cell is None else cell
+        if name in seen:
+            seen[name] += 1
+            name = f"{name}.{seen[name]}"
+        else:
+            seen[name] = 0
+        names.append(name)
+    return names
+
+def iter_rows(source, sheet=0):
+    """
+    Streams the rows of a worksheet as tuples of cell values, header row first.
+    source is a path or a binary file-like object; sheet is a worksheet index or name.
+    The workbook is opened read-only with cached formula results, and closed afterwards.
+    """
+    workbook = openpyxl.load_workbook(source, read_only=True, data_only=True)
+    try:
+        worksheet = workbook.worksheets[sheet] if isinstance(sheet, int) else workbook[sheet]
+        # Some writers record a wrong sheet size; read-only mode would trust it and cut rows off
+        worksheet.reset_dimensions()
+        for row in worksheet.iter_rows(values_only=True):
+            yield tuple(_clean(value) for value in row)
+    finally:
+        workbook.close()
+
+class Table:
+    """The rows of a worksheet under its header, with columns looked up by header name."""
+
+    def __init__(self, columns, rows):
+        self.columns = columns
+        self.rows = rows
+        self._positions = {name: i for i, name in enumerate(columns)}
+
+    def __len__(self):
+        return len(self.rows)
+
+    def __contains__(self, name):
+        return name in self._positions
+
+    def __iter__(self):
+        return iter(self.rows)
+
+    def column(self, name):
+        """Returns every value of a column, top to bottom."""
+        position = self._positions[name]
+        return [row[position] for row in self.rows]
+
+    def records(self):
+        """
+        Yields each row as a namedtuple whose fields are the headers made into identifiers
+        ("Do's" -> Do_s); headers that can't be made into one are named by position (_0, _1, ...).
+        """
+        fields = [re.sub(r"\W+", "_", str(name)).strip("_") for name in self.columns]
+        Record = namedtuple("Record", fields, rename=True)
+        for row in self.rows:
+            yield Record._make(row)
+
+def read_table(source, sheet=0):
+    """
+    Reads a worksheet whose first row is the header into a Table. Rows are padded or cut
+    to the header's width, and rows without any value are skipped, as pd.read_excel did.
+    """
+    count_event("read_excel")
+    rows = iter_rows(source, sheet)
+    header = list(next(rows, ()))
+    while header and header[-1] is None:
+        header.pop()
+    width = len(header)
+    data = []
+    for row in rows:
+        row = row[:width] + (None,) * (width - len(row))
+        if any(value is not None for value in row):
+            data.append(row)
+    return Table(_header_names(header), data)
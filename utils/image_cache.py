@@ -0,0 +1,123 @@
+import hashlib
+import io
+import os
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from PIL import Image as PILImage
+from pptx.opc.constants import RELATIONSHIP_TYPE as RT
+from pptx.parts.image import Image, ImagePart
+from config import IMAGE_CACHE_MAX_BYTES
+from utils.instrumentation import count_event
+from utils.image_preparation import prepared_path
+
+# Seconds between mtime checks of a cached image, so repeated placements don't stat the share
+STAT_INTERVAL = 2.0
+
+class CachedImage:
+    """Bytes, SHA1 and pixel size of one image file, read from disk once."""
+
+    def __init__(self, path, blob, signature):
+        self.path = path
+        self.blob = blob
+        self.signature = signature
+        self.checked_at = time.monotonic()
+        self.sha1 = hashlib.sha1(blob).hexdigest()
+        with PILImage.open(io.BytesIO(blob)) as img:
+            self.size = img.size
+        self.image = Image.from_blob(blob, os.path.basename(path))
+
+# path -> CachedImage, least recently used first
+_IMAGES = OrderedDict()
+_TOTAL_BYTES = 0
+_LOCK = threading.Lock()
+
+# package -> {sha1: ImagePart} for the images already in each open deck
+_DECK_IMAGE_PARTS = weakref.WeakKeyDictionary()
+
+def _file_signature(path):
+    stat = os.stat(path)
+    return stat.st_mtime_ns, stat.st_size
+
+def _evict(max_bytes):
+    """Drops least recently used images until the cache fits in max_bytes."""
+    global _TOTAL_BYTES
+    while _TOTAL_BYTES > max_bytes and len(_IMAGES) > 1:
+        _, evicted = _IMAGES.popitem(last=False)
+        _TOTAL_BYTES -= len(evicted.blob)
+
+def get_image(path):
+    """Returns the CachedImage for a file, re-reading it only when it changed on disk."""
+    global _TOTAL_BYTES
+    now = time.monotonic()
+    with _LOCK:
+        cached = _IMAGES.get(path)
+        if cached is not None:
+            _IMAGES.move_to_end(path)
+            if now - cached.checked_at < STAT_INTERVAL:
+                return cached
+            if _file_signature(path) == cached.signature:
+                cached.checked_at = now
+                return cached
+            _TOTAL_BYTES -= len(_IMAGES.pop(path).blob)
+
+        signature = _file_signature(path)
+        with open(path, "rb") as f:
+            cached = CachedImage(path, f.read(), signature)
+        _IMAGES[path] = cached
+        _TOTAL_BYTES += len(cached.blob)
+        _evict(IMAGE_CACHE_MAX_BYTES)
+        return cached
+
+def image_cache_stats():
+    """Returns (number of cached images, total cached bytes)."""
+    with _LOCK:
+        return len(_IMAGES), _TOTAL_BYTES
+
+def clear_image_cache():
+    global _TOTAL_BYTES
+    with _LOCK:
+        _IMAGES.clear()
+        _TOTAL_BYTES = 0
+
+def _deck_image_parts(package):
+    """Returns the sha1 -> ImagePart registry of a deck, scanning its existing images once."""
+    parts = _DECK_IMAGE_PARTS.get(package)
+    if parts is None:
+        parts = {}
+        for image_part in package._image_parts:
+            # Skip unknown/unsupported image types, like SVG
+            if hasattr(image_part, "sha1"):
+                parts.setdefault(image_part.sha1, image_part)
+        _DECK_IMAGE_PARTS[package] = parts
+    return parts
+
+def get_or_add_image_part(slide, path, width=None, height=None):
+    """
+    Returns (image_part, rId) for the image at path on this slide. An image that is already
+    in the deck reuses its image part, so placing it again adds only a relationship.
+    Given the width and height (EMU) it is shown at, a copy resampled for that box is used.
+    """
+    cached = get_image(path)
+    prepared = prepared_path(cached, width, height)
+    if prepared is not None:
+        cached = get_image(prepared)
+    package = slide.part.package
+    parts = _deck_image_parts(package)
+    image_part = parts.get(cached.sha1)
+    if image_part is None:
+        # A resampled copy keeps the source file name, which PowerPoint shows as the picture's description
+        image = cached.image if prepared is None else Image.from_blob(cached.blob, os.path.basename(path))
+        image_part = ImagePart.new(package, image)
+        parts[cached.sha1] = image_part
+    return image_part, slide.part.relate_to(image_part, RT.IMAGE)
+
+def add_picture(slide, path, left, top, width=None, height=None):
+    """Drop-in for slide.shapes.add_picture(path, ...) that reads images from the cache."""
+    count_event("add_picture")
+    image_part, rId = get_or_add_image_part(slide, path, width, height)
+    shapes = slide.shapes
+    pic = shapes._add_pic_from_image_part(image_part, rId, left, top, width, height)
+    shapes._recalculate_extents()
+    return shapes._shape_factory(pic)
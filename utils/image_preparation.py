@@ -0,0 +1,87 @@
+import io
+import os
+import threading
+import zlib
+from PIL import Image as PILImage
+import config
+from utils.package_writer import COMPRESS_LEVEL
+
+EMU_PER_INCH = 914400
+
+# (source sha1, width px, height px, cache folder) -> path of the prepared file, or None to embed the source
+_PREPARED = {}
+_LOCK = threading.Lock()
+
+def target_pixels(width, height, dpi):
+    """Pixel size that shows a box of width x height EMU at dpi."""
+    return max(1, round(width / EMU_PER_INCH * dpi)), max(1, round(height / EMU_PER_INCH * dpi))
+
+def _resample(blob, size):
+    """Resizes an image to size and encodes it compactly in its own format; returns the bytes."""
+    with PILImage.open(io.BytesIO(blob)) as img:
+        image_format = img.format
+        if img.mode in ("P", "1", "LA", "I;16"):
+            # Palette and odd modes only resize with nearest-neighbour, so filter in full colour
+            img = img.convert("RGBA" if img.mode in ("P", "LA") else "RGB")
+        resized = img.resize(size, PILImage.LANCZOS)
+    out = io.BytesIO()
+    if image_format == "JPEG":
+        resized.convert("RGB").save(out, "JPEG", quality=90, optimize=True)
+    else:
+        resized.save(out, "PNG", optimize=True)
+    return out.getvalue()
+
+def _packed_size(data):
+    """Bytes data takes in the saved package, which deflates a part unless that doesn't shrink it."""
+    return min(len(data), len(zlib.compress(data, COMPRESS_LEVEL)))
+
+def _write_atomically(path, data):
+    """Writes data so other processes never see a half-written file."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+def prepared_path(cached, width, height):
+    """
+    Returns the path of a copy of a cached image resampled for a width x height EMU box at
+    config.IMAGE_TARGET_DPI, or None when the source should be embedded as it is: preparation
+    is off, the source is not larger than the box needs, or resampling wouldn't make the saved
+    report smaller. Copies are kept in config.PREPARED_IMAGE_CACHE_DIR under the source hash
+    and target size, with a marker file when the source wins. Both settings are read on
+    every call, so runtime overrides apply.
+    """
+    dpi, cache_dir = config.IMAGE_TARGET_DPI, config.PREPARED_IMAGE_CACHE_DIR
+    if not dpi or not width or not height:
+        return None
+    size = target_pixels(width, height, dpi)
+    if cached.size[0] <= size[0] and cached.size[1] <= size[1]:
+        return None
+
+    key = (cached.sha1, *size, cache_dir)
+    with _LOCK:
+        if key in _PREPARED:
+            return _PREPARED[key]
+
+    ext = os.path.splitext(cached.path)[1].lower() or ".png"
+    path = os.path.join(cache_dir, f"{cached.sha1}_{size[0]}x{size[1]}{ext}")
+    # An empty marker next to it records that the source is the smaller one, for other processes
+    source_marker = f"{path}.source"
+    if os.path.exists(source_marker):
+        path = None
+    elif not os.path.exists(path):
+        data = _resample(cached.blob, size)
+        if _packed_size(data) >= _packed_size(cached.blob):
+            _write_atomically(source_marker, b"")
+            path = None
+        else:
+            _write_atomically(path, data)
+    with _LOCK:
+        _PREPARED[key] = path
+    return path
+
+def clear_prepared_images():
+    """Forgets which copies exist; the files in config.PREPARED_IMAGE_CACHE_DIR are kept."""
+    with _LOCK:
+        _PREPARED.clear()
@@ -0,0 +1,182 @@
+import contextlib
+import cProfile
+import csv
+import io
+import json
+import os
+import sys
+import threading
+import time
+from config import INSTRUMENTATION_FILE, PROFILE_DIR
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+RECORD_FIELDS = [
+    "patient", "stage", "wall_s", "cpu_s", "peak_rss_mb", "read_bytes", "write_bytes",
+    "read_excel", "add_picture", "swap_picture", "save",
+]
+COUNTED_EVENTS = ("read_excel", "add_picture", "swap_picture", "save")
+
+_settings = {"output_path": INSTRUMENTATION_FILE, "profile_dir": PROFILE_DIR}
+_state = threading.local()
+_write_lock = threading.Lock()
+_hooks_installed = False
+
+def configure_instrumentation(output_path=None, profile_dir=None):
+    """
+    Turns instrumentation on (or off when both are None). Records go to output_path as
+    JSON lines, or CSV when it ends with .csv; profile_dir gets one cProfile dump per
+    outermost stage, e.g. <patient>_total.prof covering every step of a report.
+    Also used as the worker initializer of the batch runner.
+    """
+    _settings["output_path"] = output_path
+    _settings["profile_dir"] = profile_dir
+    if output_path or profile_dir:
+        _install_hooks()
+
+def get_instrumentation_settings():
+    return _settings["output_path"], _settings["profile_dir"]
+
+def is_enabled():
+    return bool(_settings["output_path"] or _settings["profile_dir"])
+
+def _install_hooks():
+    """Counts Presentation.save calls without touching the step modules; read_table counts its own reads."""
+    global _hooks_installed
+    if _hooks_installed:
+        return
+    from pptx.presentation import Presentation
+
+    def counted(event, func):
+        def wrapper(*args, **kwargs):
+            count_event(event)
+            return func(*args, **kwargs)
+        wrapper.__wrapped__ = func
+        return wrapper
+
+    Presentation.save = counted("save", Presentation.save)
+    _hooks_installed = True
+
+def _active_records():
+    if not hasattr(_state, "stack"):
+        _state.stack = []
+        _state.patient = None
+        _state.profiler = None
+    return _state.stack
+
+def count_event(event):
+    """Adds one occurrence of event to every stage that is currently running on this thread."""
+    for record in _active_records():
+        record[event] = record.get(event, 0) + 1
+
+def _peak_rss_mb():
+    if psutil is not None:
+        info = psutil.Process().memory_info()
+        return round(getattr(info, "peak_wset", info.rss) / (1024 * 1024), 1)
+    if resource is not None:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss is in bytes on macOS and in kilobytes elsewhere
+        return round(peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024, 1)
+    return None
+
+def _io_bytes():
+    """Returns (bytes read, bytes written) by this process so far, or (None, None)."""
+    if psutil is not None:
+        try:
+            counters = psutil.Process().io_counters()
+            return counters.read_bytes + getattr(counters, "other_bytes", 0), counters.write_bytes
+        except (AttributeError, psutil.Error):
+            pass
+    try:
+        with open("/proc/self/io", "r") as f:
+            values = dict(line.split(": ") for line in f.read().splitlines())
+        return int(values["rchar"]), int(values["wchar"])
+    except (OSError, KeyError, ValueError):
+        return None, None
+
+def _write_record(record):
+    output_path = _settings["output_path"]
+    if not output_path:
+        return
+    row = {field: record.get(field) for field in RECORD_FIELDS}
+    with _write_lock:
+        os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+        if output_path.lower().endswith(".csv"):
+            buffer = io.StringIO()
+            writer = csv.DictWriter(buffer, fieldnames=RECORD_FIELDS)
+            if not os.path.exists(output_path) or os.path.getsize(output_path) == 0:
+                writer.writeheader()
+            writer.writerow(row)
+            line = buffer.getvalue()
+        else:
+            line = json.dumps(row) + "\n"
+        # One write per record so concurrent workers don't interleave lines
+        with open(output_path, "a", encoding="utf-8", newline="") as f:
+            f.write(line)
+
+@contextlib.contextmanager
+def stage(name, patient=None):
+    """
+    Measures a block of work as one stage: wall and CPU time, peak RSS, bytes read and
+    written, and read_excel/add_picture/swap_picture/save call counts. A no-op when instrumentation is off.
+    """
+    if not is_enabled():
+        yield
+        return
+
+    stack = _active_records()
+    patient = patient or _state.patient
+    record = {"patient": patient, "stage": name}
+    record.update({event: 0 for event in COUNTED_EVENTS})
+    read_start, write_start = _io_bytes()
+    wall_start, cpu_start = time.perf_counter(), time.process_time()
+
+    # Only the outermost stage on a thread profiles; nested stages show up inside its dump
+    profiler = None
+    if _settings["profile_dir"] and _state.profiler is None:
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:
+            profiler = None  # Another profiler (e.g. python -m cProfile) is already running
+        else:
+            _state.profiler = profiler
+
+    stack.append(record)
+    try:
+        yield record
+    finally:
+        stack.pop()
+        if profiler is not None:
+            profiler.disable()
+            _state.profiler = None
+            os.makedirs(_settings["profile_dir"], exist_ok=True)
+            profiler.dump_stats(os.path.join(_settings["profile_dir"], f"{patient or 'batch'}_{name}.prof"))
+
+        read_end, write_end = _io_bytes()
+        record["wall_s"] = round(time.perf_counter() - wall_start, 4)
+        record["cpu_s"] = round(time.process_time() - cpu_start, 4)
+        record["peak_rss_mb"] = _peak_rss_mb()
+        if read_start is not None and read_end is not None:
+            record["read_bytes"] = read_end - read_start
+            record["write_bytes"] = write_end - write_start
+        _write_record(record)
+
+@contextlib.contextmanager
+def patient_run(patient_code):
+    """Wraps a whole report: nested stages are tagged with the patient and a 'total' row is written."""
+    _active_records()
+    previous, _state.patient = _state.patient, patient_code
+    try:
+        with stage("total", patient_code):
+            yield
+    finally:
+        _state.patient = previous
@@ -0,0 +1,136 @@
+import math
+import threading
+from functools import lru_cache
+from PIL import ImageFont
+from pptx.util import Pt
+import config
+
+# Fonts are loaded at this pixel size and advances scaled to the requested point size
+MEASURE_SIZE = 1000
+
+# PowerPoint's single line spacing is about 1.2 x the font size
+LINE_SPACING = 1.2
+
+# Default text frame insets (0.1" left/right, 0.05" top/bottom)
+INSET_X = 91440
+INSET_Y = 45720
+
+# Average advance of an Arial character, used only when no font file can be loaded
+FALLBACK_CHAR_EM = 0.52
+
+_FALLBACK_FONTS = {
+    False: ["arial.ttf", "Arial.ttf", "LiberationSans-Regular.ttf", "DejaVuSans.ttf"],
+    True: ["arialbd.ttf", "Arial Bold.ttf", "LiberationSans-Bold.ttf", "DejaVuSans-Bold.ttf"],
+}
+
+_FONTS = {}
+_LOCK = threading.Lock()
+
+def _load_font(bold):
+    """Loads the Arial face (or the closest available substitute) used for measuring."""
+    with _LOCK:
+        if bold in _FONTS:
+            return _FONTS[bold]
+        configured = config.ARIAL_BOLD_FONT if bold else config.ARIAL_FONT
+        font = None
+        for candidate in [configured] + _FALLBACK_FONTS[bold]:
+            try:
+                font = ImageFont.truetype(candidate, MEASURE_SIZE)
+                break
+            except OSError:
+                continue
+        if font is None:
+            try:
+                font = ImageFont.load_default(size=MEASURE_SIZE)
+            except (TypeError, ImportError):
+                font = None
+            print(f"⚠️ Arial not found ({configured}), text measurement is approximate")
+        _FONTS[bold] = font
+        return font
+
+@lru_cache(maxsize=65536)
+def text_width(text, size_pt, bold=False):
+    """Returns the width of a single line of Arial text in EMU."""
+    font = _load_font(bold)
+    if font is None or not hasattr(font, "getlength"):
+        em = len(text) * FALLBACK_CHAR_EM
+    else:
+        em = font.getlength(text) / MEASURE_SIZE
+    return int(em * Pt(size_pt))
+
+def line_height(size_pt):
+    return int(Pt(size_pt) * LINE_SPACING)
+
+def wrap_text(text, width, size_pt, bold=False):
+    """Word-wraps text to a line width in EMU the way a text frame does, returning the lines."""
+    space = text_width(" ", size_pt, bold)
+    lines = []
+    for source_line in text.split("\n"):
+        line, line_width = "", 0
+        for word in source_line.split():
+            word_width = text_width(word, size_pt, bold)
+            if line and line_width + space + word_width > width:
+                lines.append(line)
+                line, line_width = "", 0
+            if line:
+                line, line_width = f"{line} {word}", line_width + space + word_width
+            else:
+                line, line_width = word, word_width
+        lines.append(line)
+    return lines
+
+def count_lines(text, width, size_pt, bold=False):
+    """Number of rendered lines, counting a word wider than the box once per line it breaks onto."""
+    count = 0
+    for line in wrap_text(text, width, size_pt, bold):
+        count += max(1, math.ceil(text_width(line, size_pt, bold) / width)) if width > 0 else 1
+    return count
+
+def paragraph_heights(paragraphs, box_width, size_pt, bold=False, space_after=0):
+    """Height in EMU each paragraph takes in a text box of the given width."""
+    width = box_width - 2 * INSET_X
+    return [count_lines(p, width, size_pt, bold) * line_height(size_pt) + space_after for p in paragraphs]
+
+def text_height(paragraphs, box_width, size_pt, bold=False, space_after=0):
+    """Height in EMU of a text box that exactly fits the paragraphs, insets included."""
+    return sum(paragraph_heights(paragraphs, box_width, size_pt, bold, space_after)) + 2 * INSET_Y
+
+def fit_paragraphs(paragraphs, box_width, box_height, size_pt, bold=False, space_after=0):
+    """Returns how many leading paragraphs fit in a box of the given size."""
+    available = box_height - 2 * INSET_Y
+    used = 0
+    for count, height in enumerate(paragraph_heights(paragraphs, box_width, size_pt, bold, space_after)):
+        if used + height > available:
+            return count
+        used += height
+    return len(paragraphs)
+
+class SlideStack:
+    """
+    Plans cards stacked top to bottom over a range of slides.
+    place() returns the (slide_index, y) for a card of the given height, moving to the next
+    slide when it doesn't fit, or None once the range is used up.
+    """
+
+    def __init__(self, slide_index, end_slide, y, top, bottom, gap):
+        self.slide_index = slide_index
+        self.end_slide = end_slide
+        self.y = y
+        self.top = top
+        self.bottom = bottom
+        self.gap = gap
+
+    def place(self, height):
+        if self.y + height > self.bottom and self.y > self.top:
+            if self.slide_index + 1 > self.end_slide:
+                return None
+            self.slide_index += 1
+            self.y = self.top
+        position = (self.slide_index, self.y)
+        self.y += height + self.gap
+        return position
+
+def clear_layout_cache():
+    text_width.cache_clear()
+    with _LOCK:
+        _FONTS.clear()
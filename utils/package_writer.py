@@ -0,0 +1,169 @@
+import io
+import os
+import struct
+import threading
+import time
+import zipfile
+import zlib
+from pptx.opc.constants import CONTENT_TYPE as CT
+from pptx.opc.oxml import CT_Types, serialize_part_xml
+from pptx.opc.packuri import CONTENT_TYPES_URI, PACKAGE_URI
+from pptx.opc.spec import default_content_types
+from config import lifeStyle_template
+from utils.template_cache import get_template_package
+from utils.instrumentation import count_event
+
+COMPRESS_LEVEL = 6
+
+LOCAL_HEADER = struct.Struct("<4s5H3L2H")
+CENTRAL_HEADER = struct.Struct("<4s6H3L5H2L")
+END_RECORD = struct.Struct("<4s4H2LH")
+
+# template path -> (template signature, {membername: entry}) where entry is
+# (crc and size of the part as python-pptx serializes it, crc, size, method and raw data of the stored entry)
+_TEMPLATE_ENTRIES = {}
+_LOCK = threading.Lock()
+
+def _content_types_xml(parts):
+    """
+    Builds [Content_Types].xml the way python-pptx does: a Default per extension with its
+    standard content type, an Override per other part, each sorted.
+    """
+    defaults = {"rels": CT.OPC_RELATIONSHIPS, "xml": CT.XML}
+    overrides = {}
+    for part in parts:
+        ext = part.partname.ext.lower()
+        if (ext, part.content_type) in default_content_types:
+            defaults[ext] = part.content_type
+        else:
+            overrides[part.partname] = part.content_type
+    types = CT_Types.new()
+    for ext, content_type in sorted(defaults.items()):
+        types.add_default(ext, content_type)
+    for partname, content_type in sorted(overrides.items()):
+        types.add_override(partname, content_type)
+    return serialize_part_xml(types)
+
+def _iter_members(package):
+    """Yields (membername, blob) for every item of a package, in the order python-pptx writes them."""
+    parts = tuple(package.iter_parts())
+    yield CONTENT_TYPES_URI.lstrip("/"), _content_types_xml(parts)
+    yield PACKAGE_URI.rels_uri.membername, package._rels.xml
+    for part in parts:
+        yield part.partname.membername, part.blob
+        if part._rels:
+            yield part.partname.rels_uri.membername, part.rels.xml
+
+def _raw_entries(blob):
+    """Maps each member of a zip held in memory to its (crc, size, method, compressed data)."""
+    view = memoryview(blob)
+    entries = {}
+    with zipfile.ZipFile(io.BytesIO(blob)) as zf:
+        for info in zf.infolist():
+            name_length, extra_length = struct.unpack_from("<2H", blob, info.header_offset + 26)
+            start = info.header_offset + 30 + name_length + extra_length
+            entries[info.filename] = (info.CRC, info.file_size, info.compress_type,
+                                      view[start:start + info.compress_size])
+    return entries
+
+def _get_template_entries(template_path):
+    """Returns the reusable entries of the template, indexed once per template version."""
+    signature, blob, master = get_template_package(template_path)
+    with _LOCK:
+        cached = _TEMPLATE_ENTRIES.get(template_path)
+        if cached is not None and cached[0] == signature:
+            return cached[1]
+        raw = _raw_entries(blob)
+        entries = {}
+        for name, data in _iter_members(master.part.package):
+            # Entries stored with any other method are recompressed instead of copied
+            if name in raw and raw[name][2] in (zipfile.ZIP_STORED, zipfile.ZIP_DEFLATED):
+                entries[name] = (zlib.crc32(data), len(data)) + raw[name]
+        _TEMPLATE_ENTRIES[template_path] = (signature, entries)
+        return entries
+
+def _dos_datetime(timestamp):
+    t = time.localtime(timestamp)
+    return ((t.tm_hour << 11) | (t.tm_min << 5) | (t.tm_sec // 2),
+            ((t.tm_year - 1980) << 9) | (t.tm_mon << 5) | t.tm_mday)
+
+class _ZipStream:
+    """Writes zip entries sequentially to a stream that never needs to seek."""
+
+    def __init__(self, stream):
+        self.stream = stream
+        self.offset = 0
+        self.central = []
+        self.dos_time, self.dos_date = _dos_datetime(time.time())
+
+    def _write(self, data):
+        self.stream.write(data)
+        self.offset += len(data)
+
+    def add(self, name, crc, size, method, compressed):
+        encoded = name.encode("utf-8")
+        header = LOCAL_HEADER.pack(b"PK\x03\x04", 20, 0, method, self.dos_time, self.dos_date,
+                                   crc, len(compressed), size, len(encoded), 0)
+        self.central.append((encoded, crc, size, method, len(compressed), self.offset))
+        self._write(header)
+        self._write(encoded)
+        self._write(compressed)
+
+    def add_blob(self, name, data):
+        """Deflates data, or stores it when deflating doesn't make it smaller (e.g. most JPEGs)."""
+        compressor = zlib.compressobj(COMPRESS_LEVEL, zlib.DEFLATED, -15)
+        compressed = compressor.compress(data) + compressor.flush()
+        if len(compressed) < len(data):
+            self.add(name, zlib.crc32(data), len(data), zipfile.ZIP_DEFLATED, compressed)
+        else:
+            self.add(name, zlib.crc32(data), len(data), zipfile.ZIP_STORED, data)
+
+    def close(self):
+        start = self.offset
+        for encoded, crc, size, method, compressed_size, offset in self.central:
+            self._write(CENTRAL_HEADER.pack(b"PK\x01\x02", 20, 20, 0, method, self.dos_time, self.dos_date,
+                                            crc, compressed_size, size, len(encoded), 0, 0, 0, 0, 0, offset))
+            self._write(encoded)
+        self._write(END_RECORD.pack(b"PK\x05\x06", 0, 0, len(self.central), len(self.central),
+                                    self.offset - start, start, 0))
+
+def write_package(prs, stream, template_path=lifeStyle_template):
+    """
+    Streams a presentation cloned from the template into a writable binary stream.
+    Parts that are byte-for-byte unchanged from the template are copied over as their
+    already-compressed zip entries; only new or modified parts are deflated.
+    Returns {"copied": n, "compressed": n, "bytes": n}.
+    """
+    count_event("save")
+    template_entries = _get_template_entries(template_path)
+    writer = _ZipStream(stream)
+    copied = compressed = 0
+    for name, data in _iter_members(prs.part.package):
+        entry = template_entries.get(name)
+        if entry is not None and entry[:2] == (zlib.crc32(data), len(data)):
+            writer.add(name, *entry[2:])
+            copied += 1
+        else:
+            writer.add_blob(name, data)
+            compressed += 1
+    writer.close()
+    return {"copied": copied, "compressed": compressed, "bytes": writer.offset}
+
+def save_presentation(prs, target, template_path=lifeStyle_template):
+    """
+    Writes the finished deck straight to target, a file path or a writable binary
+    stream such as io.BytesIO. A partly written file is removed if writing fails.
+    """
+    if not isinstance(target, (str, os.PathLike)):
+        return write_package(prs, target, template_path)
+    try:
+        with open(target, "wb") as f:
+            return write_package(prs, f, template_path)
+    except BaseException:
+        if os.path.exists(target):
+            os.remove(target)
+        raise
+
+def clear_package_writer_cache():
+    with _LOCK:
+        _TEMPLATE_ENTRIES.clear()
@@ -0,0 +1,26 @@
+import os
+from config import patients_folder
+from utils.scoring_chart_index import find_scoring_chart
+
+def patient_input_paths(patient_code):
+    """Returns the expected path of every per-patient input; the scoring chart is None when there is none."""
+    patient_dir = os.path.join(patients_folder, patient_code)
+    return {
+        "json": os.path.join(patient_dir, f"{patient_code}.json"),
+        "intolerance": os.path.join(patient_dir, f"{patient_code}_intolerance.json"),
+        "vitamin_sheet": os.path.join(patient_dir, f"{patient_code}_vitamin_sheet.xlsx"),
+        "scoring_chart": find_scoring_chart(patient_code),
+    }
+
+def read_patient_inputs(patient_code):
+    """Reads every per-patient input that exists into memory, as {name: (path, raw bytes)}."""
+    inputs = {}
+    for name, path in patient_input_paths(patient_code).items():
+        if not path:
+            continue
+        try:
+            with open(path, "rb") as f:
+                inputs[name] = (path, f.read())
+        except FileNotFoundError:
+            continue
+    return inputs
@@ -0,0 +1,95 @@
+import io
+import json
+from dataclasses import dataclass, field
+from utils.excel_reader import read_table, Table
+from utils.patient_inputs import read_patient_inputs
+
+CONDITION_COLUMN = "Medical Condition "
+SEVERITY_LEVELS = ["Moderate to High", "Moderate", "Mild", "Low"]  # Card priority order
+RISK_SEVERITY_COLUMNS = ["Low", "Mild", "Moderate", "Moderate to High"]  # First match wins
+
+def _flag_column(table, column):
+    """str(cell).strip().lower() == 'y' over a column; all False when it is missing."""
+    if column not in table:
+        return [False] * len(table)
+    return [str(value).strip().lower() == "y" for value in table.column(column)]
+
+@dataclass
+class PatientProfile:
+    """Everything the report steps need about one patient, read from disk exactly once."""
+    patient_code: str = None
+    data: dict = field(default_factory=dict)
+    intolerance: dict = None
+    vitamin_sheet: Table = None
+    scoring_chart: str = None
+    source_paths: dict = field(default_factory=dict)
+    condition_names: list = field(default_factory=list)
+    concern_flags: list = field(default_factory=list)
+    severity_flags: dict = field(default_factory=dict)
+    severity_mapping: dict = field(default_factory=dict)
+
+    def severity_conditions(self, severity_order=SEVERITY_LEVELS):
+        """
+        Returns fresh (concern_conditions, other_conditions) lists of (severity, condition)
+        for the given severities, in chart row order and then severity order.
+        """
+        concern_conditions = []
+        other_conditions = []
+        flags = [(severity, self.severity_flags[severity]) for severity in severity_order
+                 if severity in self.severity_flags]
+
+        for i, condition_name in enumerate(self.condition_names):
+            target = concern_conditions if self.concern_flags[i] else other_conditions
+            for severity, column in flags:
+                if column[i]:
+                    target.append((severity, condition_name))
+        return concern_conditions, other_conditions
+
+def read_scoring_chart(excel_path, profile=None, source=None):
+    """
+    Parses a scoring chart column by column and stores the result on the profile.
+    source is an already opened file-like copy of the chart; excel_path is read when it is None.
+    """
+    profile = profile or PatientProfile()
+    table = read_table(excel_path if source is None else source)
+    raw_names = table.column(CONDITION_COLUMN)
+
+    profile.scoring_chart = excel_path
+    profile.condition_names = [name.replace(" ", "_") if isinstance(name, str) else None for name in raw_names]
+    profile.concern_flags = _flag_column(table, "concerns")
+    profile.severity_flags = {severity: _flag_column(table, severity)
+                              for severity in SEVERITY_LEVELS if severity in table}
+
+    # The risk thermometers use the raw names and an exact 'y' match, defaulting to Low
+    mapping = ["Low"] * len(table)
+    for column in reversed(RISK_SEVERITY_COLUMNS):
+        if column in table:
+            for i, value in enumerate(table.column(column)):
+                if value == "y":
+                    mapping[i] = column
+    profile.severity_mapping = dict(zip(raw_names, mapping))
+    return profile
+
+def load_patient_profile(patient_code, inputs=None):
+    """
+    Builds the PatientProfile for a patient from the sequencing JSON, intolerance JSON,
+    vitamin sheet and scoring chart. Missing optional inputs are left as None.
+    inputs are the raw files already read by read_patient_inputs (e.g. by a prefetch stage).
+    """
+    if inputs is None:
+        inputs = read_patient_inputs(patient_code)
+    if "json" not in inputs:
+        raise FileNotFoundError(f"Patient JSON not found for {patient_code}")
+
+    profile = PatientProfile(patient_code=patient_code)
+    profile.source_paths = {name: path for name, (path, _) in inputs.items()}
+
+    profile.data = json.loads(inputs["json"][1].decode("utf-8"))
+    if "intolerance" in inputs:
+        profile.intolerance = json.loads(inputs["intolerance"][1].decode("utf-8"))
+    if "vitamin_sheet" in inputs:
+        profile.vitamin_sheet = read_table(io.BytesIO(inputs["vitamin_sheet"][1]))
+    if "scoring_chart" in inputs:
+        path, blob = inputs["scoring_chart"]
+        read_scoring_chart(path, profile, source=io.BytesIO(blob))
+    return profile
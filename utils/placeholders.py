@@ -0,0 +1,89 @@
+import re
+from pptx.shapes.group import GroupShape
+
+PLACEHOLDER_PATTERN = re.compile(r"\{([^{}]+)\}")
+
+def iter_paragraphs(shapes):
+    """Yields every paragraph in text frames, table cells and (nested) group shapes."""
+    for shape in shapes:
+        if shape.has_text_frame:
+            yield from shape.text_frame.paragraphs
+        if getattr(shape, "has_table", False) and shape.has_table:
+            for row in shape.table.rows:
+                for cell in row.cells:
+                    yield from cell.text_frame.paragraphs
+        if isinstance(shape, GroupShape):
+            yield from iter_paragraphs(shape.shapes)
+
+def index_placeholders(prs):
+    """
+    Scans the deck once and returns [(paragraph, runs, matches)] for every paragraph
+    holding a {placeholder}. Matches are found on the joined run text, so placeholders
+    split across several runs are included. Each match is (start, end, name).
+    """
+    index = []
+    for slide in prs.slides:
+        for paragraph in iter_paragraphs(slide.shapes):
+            runs = paragraph.runs
+            if not runs:
+                continue
+            text = "".join(run.text for run in runs)
+            if "{" not in text:
+                continue
+            matches = [(m.start(), m.end(), m.group(1)) for m in PLACEHOLDER_PATTERN.finditer(text)]
+            if matches:
+                index.append((paragraph, runs, matches))
+    return index
+
+def _splice_runs(texts, starts, start, end, value):
+    """
+    Replaces text[start:end] of the joined runs with value. Like pptx-replace, the value
+    goes into the run where the placeholder starts and keeps that run's formatting.
+    """
+    first = max(i for i, s in enumerate(starts) if s <= start)
+    last = max(i for i, s in enumerate(starts) if s < end)
+    head = texts[first][:start - starts[first]]
+    if first == last:
+        texts[first] = head + value + texts[first][end - starts[first]:]
+        return
+    texts[first] = head + value
+    for i in range(first + 1, last):
+        texts[i] = ""
+    texts[last] = texts[last][end - starts[last]:]
+
+def fill_placeholders(prs, mapping, index=None):
+    """
+    Replaces every {key} in the deck with str(mapping[key]) in a single pass.
+    Returns (unknown_keys, unfilled_placeholders): mapping keys that have no placeholder
+    in the deck, and placeholders in the deck that the mapping did not cover.
+    """
+    if index is None:
+        index = index_placeholders(prs)
+
+    found = set()
+    unfilled = set()
+    for paragraph, runs, matches in index:
+        texts = [run.text for run in runs]
+        starts = []
+        offset = 0
+        for text in texts:
+            starts.append(offset)
+            offset += len(text)
+
+        changed = False
+        # Work backwards so earlier offsets stay valid while splicing
+        for start, end, name in reversed(matches):
+            found.add(name)
+            if name not in mapping:
+                unfilled.add(name)
+                continue
+            _splice_runs(texts, starts, start, end, str(mapping[name]))
+            changed = True
+
+        if changed:
+            for run, text in zip(runs, texts):
+                if run.text != text:
+                    run.text = text
+
+    unknown = sorted(set(mapping) - found)
+    return unknown, sorted(unfilled)
@@ -0,0 +1,31 @@
+import itertools
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+def prefetch(items, load, depth):
+    """
+    Yields (item, result, error) for every item in order, running load(item) on a thread pool
+    for up to depth items ahead of the one being consumed. At most depth results wait in
+    memory, so a long batch stays flat. error is the exception load raised, with result None.
+    """
+    items = iter(items)
+    if depth <= 0:
+        for item in items:
+            try:
+                yield item, load(item), None
+            except Exception as exc:
+                yield item, None, exc
+        return
+
+    with ThreadPoolExecutor(max_workers=depth, thread_name_prefix="prefetch") as executor:
+        pending = deque((item, executor.submit(load, item)) for item in itertools.islice(items, depth))
+        while pending:
+            item, future = pending.popleft()
+            try:
+                result, error = future.result(), None
+            except Exception as exc:
+                result, error = None, exc
+            # Keep the window full while the caller works on this item
+            for next_item in itertools.islice(items, 1):
+                pending.append((next_item, executor.submit(load, next_item)))
+            yield item, result, error
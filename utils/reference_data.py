@@ -0,0 +1,171 @@
+import os
+import re
+from bisect import bisect_right
+import threading
+import time
+from utils.excel_reader import read_table
+
+# Seconds between mtime checks of a cached workbook, so lookups don't stat the share per card
+STAT_INTERVAL = 2.0
+
+# (path, kind) -> [signature, last_checked, index]
+_WORKBOOK_CACHE = {}
+_LOCK = threading.Lock()
+
+def _file_signature(path):
+    """Returns the (mtime, size) pair used to detect a changed workbook."""
+    stat = os.stat(path)
+    return stat.st_mtime_ns, stat.st_size
+
+def format_bullet_points(value):
+    """Splits a '$'-separated cell into bullet-prefixed points, dropping empty ones."""
+    return [f"\u2022 {point.strip()}" for point in value.split('$') if point.strip()]
+
+def _build_index(path, bullets):
+    """Reads a Condition x Severity workbook into a (condition, severity) -> list[str] dictionary."""
+    table = read_table(path)
+    conditions = table.column("Condition")
+    index = {}
+    for severity in table.columns:
+        if severity == "Condition":
+            continue
+        for condition, value in zip(conditions, table.column(severity)):
+            if value is None:
+                continue
+            values = index.setdefault((condition, severity), [])
+            if bullets:
+                values.extend(format_bullet_points(value))
+            else:
+                values.append(value)
+    return index
+
+def _get_cached(path, kind, builder):
+    """Returns the cached index of a workbook, rebuilding it when the file changed on disk."""
+    key = (path, kind)
+    now = time.monotonic()
+    with _LOCK:
+        entry = _WORKBOOK_CACHE.get(key)
+        if entry is not None and now - entry[1] < STAT_INTERVAL:
+            return entry[2]
+        signature = _file_signature(path)
+        if entry is None or entry[0] != signature:
+            entry = [signature, now, builder(path)]
+            _WORKBOOK_CACHE[key] = entry
+        else:
+            entry[1] = now
+        return entry[2]
+
+def _get_index(path, bullets):
+    return _get_cached(path, "bullets" if bullets else "cells", lambda p: _build_index(p, bullets))
+
+def get_bullet_points(path, condition, severity):
+    """Returns the bullet-formatted points for a condition and severity from a reference workbook."""
+    return list(_get_index(path, True).get((condition, severity), []))
+
+def get_cell_values(path, condition, severity):
+    """Returns the non-empty raw cells for a condition and severity from a reference workbook."""
+    return list(_get_index(path, False).get((condition, severity), []))
+
+def _as_printed(values):
+    """
+    Prints a column the way pd.read_excel's did, as the RDA labels have always read: blanks
+    print as 'nan', and a numeric column with a decimal or a blank in it prints every value
+    as a decimal ('Iron (18.0)').
+    """
+    if None not in values and not any(isinstance(value, float) for value in values):
+        return values
+    numbers = [value for value in values if value is not None]
+    if all(isinstance(value, (int, float)) and not isinstance(value, bool) for value in numbers):
+        return [float("nan") if value is None else float(value) for value in values]
+    return [float("nan") if value is None else value for value in values]
+
+class RdaIndex:
+    """
+    The RDA workbook compiled for nutrient lookups. Each vitamin-sheet condition is matched
+    against the Nutrient column once per process, with the same case-insensitive
+    word-boundary regex search the vitamin step always used.
+    """
+
+    def __init__(self, table):
+        self.nutrients = table.column("Nutrient")
+        self.columns = {column: _as_printed(table.column(column)) for column in table.columns if column != "Nutrient"}
+        self._matches = {}
+
+    def match(self, condition):
+        """Returns the row of the first nutrient matching \\b{condition}\\b, or None."""
+        if condition not in self._matches:
+            pattern = re.compile(fr'\b{condition}\b', re.IGNORECASE)
+            self._matches[condition] = next(
+                (row for row, nutrient in enumerate(self.nutrients)
+                 if isinstance(nutrient, str) and pattern.search(nutrient)),
+                None,
+            )
+        return self._matches[condition]
+
+    def label(self, condition, rda_column):
+        """'Condition (value)' when the RDA sheet has the nutrient, else just the condition."""
+        row = self.match(condition)
+        if row is None:
+            return condition
+        return f"{condition} ({self.columns[rda_column][row]})"
+
+def get_rda_index(path):
+    """Returns the RdaIndex for the RDA workbook, rebuilt only when the file changes."""
+    return _get_cached(path, "rda", lambda p: RdaIndex(read_table(p)))
+
+def _split_points(value):
+    """Splits a comma-separated cell into stripped, non-empty points."""
+    return [point.strip() for point in value.split(",") if point.strip()] if value is not None else []
+
+def _unique(values):
+    return tuple(dict.fromkeys(values))
+
+class FitnessIndex:
+    """
+    A fitness workbook compiled for age lookups. The rows' Age ranges ('18-30 yrs') cut the
+    ages into segments; each segment holds the Do's and Don'ts of every row whose range
+    covers it, split, stripped and de-duplicated in sheet order, and is found with one bisect.
+    """
+
+    def __init__(self, table):
+        columns = [column.replace("’", "'") for column in table.columns]  # Curly apostrophes to straight ones
+        rows = []
+        for values in table:
+            row = dict(zip(columns, values))
+            age_range = row["Age"]
+            if "-" not in str(age_range):
+                continue
+            # Keep only the digits and the dash, e.g. '46 - 90 yrs' -> '46-90'
+            min_age, max_age = map(int, ''.join(c for c in age_range if c.isdigit() or c == '-').split("-"))
+            if min_age <= max_age:  # An inverted range never holds an age
+                rows.append((min_age, max_age, _split_points(row["Do's"]), _split_points(row["Don't's"])))
+
+        # (age, 0) opens a range at its first age, (age, 1) closes it after its last one
+        events = []
+        for i, (min_age, max_age, _, _) in enumerate(rows):
+            events += [((min_age, 0), i), ((max_age, 1), i)]
+        events.sort()
+        self.boundaries = [boundary for boundary, _ in events]
+        self.segments = [((), ())]
+        active = set()
+        for (_, closes), i in events:
+            if closes:
+                active.discard(i)
+            else:
+                active.add(i)
+            covering = [rows[j] for j in sorted(active)]
+            self.segments.append((_unique(point for row in covering for point in row[2]),
+                                  _unique(point for row in covering for point in row[3])))
+
+    def lookup(self, age):
+        """Returns the (dos, donts) pools of every row whose age range holds age."""
+        return self.segments[bisect_right(self.boundaries, (age, 0))]
+
+def get_fitness_index(path):
+    """Returns the FitnessIndex for a fitness workbook, rebuilt only when the file changes."""
+    return _get_cached(path, "fitness", lambda p: FitnessIndex(read_table(p)))
+
+def clear_reference_cache():
+    """Drops every cached workbook so the next lookup re-reads it from disk."""
+    with _LOCK:
+        _WORKBOOK_CACHE.clear()
@@ -0,0 +1,56 @@
+from lxml import etree
+from pptx.oxml import parse_xml
+from pptx.oxml.ns import nsdecls
+
+def set_text_defaults(text_frame, font_name=None, size=None, bold=None, space_after=None):
+    """
+    Puts the formatting every paragraph of a text frame shares into the frame's list style
+    (a:lstStyle/a:lvl1pPr), so paragraphs and runs don't each repeat it.
+    size and space_after are Lengths, e.g. Pt(9) and Cm(0.1).
+    """
+    spacing = "" if space_after is None else f'<a:spcAft><a:spcPts val="{space_after.centipoints}"/></a:spcAft>'
+    attributes = "" if size is None else f' sz="{size.centipoints}"'
+    attributes += "" if bold is None else f' b="{int(bool(bold))}"'
+    latin = "" if font_name is None else f'<a:latin typeface="{font_name}"/>'
+    lst_style = parse_xml(
+        f'<a:lstStyle {nsdecls("a")}><a:lvl1pPr>{spacing}<a:defRPr{attributes}>{latin}</a:defRPr></a:lvl1pPr></a:lstStyle>'
+    )
+    tx_body = text_frame._txBody
+    old = tx_body.find(lst_style.tag)
+    if old is not None:
+        tx_body.replace(old, lst_style)
+    else:
+        tx_body.bodyPr.addnext(lst_style)
+
+def word_spans(text, bold_words):
+    """Splits text into (word + ' ', bold) spans; a word is bold when it is in bold_words, trailing commas aside."""
+    return [(word + ' ', word.strip(',') in bold_words) for word in text.split()]
+
+def coalesce(spans):
+    """Merges adjacent (text, bold) spans with the same formatting into one span."""
+    merged = []
+    for text, bold in spans:
+        if merged and merged[-1][1] == bold:
+            merged[-1] = (merged[-1][0] + text, bold)
+        else:
+            merged.append((text, bold))
+    return merged
+
+def write_spans(paragraph, spans):
+    """Writes spans as one run per stretch of equal formatting; only bold runs carry run properties."""
+    paragraph.clear()
+    for text, bold in coalesce(spans):
+        run = paragraph.add_run()
+        run.text = text
+        if bold:
+            run.font.bold = True
+
+def write_lines(text_frame, lines):
+    """Writes one plain paragraph per line, formatted by the frame's defaults."""
+    for idx, line in enumerate(lines):
+        p = text_frame.paragraphs[0] if idx == 0 else text_frame.add_paragraph()
+        p.text = line
+
+def xml_size(element):
+    """Size in bytes of an element serialized as it is saved."""
+    return len(etree.tostring(element, encoding="UTF-8"))
@@ -0,0 +1,177 @@
+import json
+import os
+import threading
+from config import scoring_charts, SCORING_CHART_INDEX_FILE
+
+CHART_MARKER = "_Scoring_chart"
+
+# In-memory copy of the on-disk index:
+# {"root": ..., "dirs": {dirpath: mtime}, "charts": {patient_id: [path, mtime]}}
+_INDEX = None
+_LOCK = threading.Lock()
+
+def _empty_index(root):
+    return {"root": root, "dirs": {}, "charts": {}}
+
+def _load_index(root, index_file):
+    """Loads the persisted index, falling back to an empty one if it is missing or for another root."""
+    if os.path.exists(index_file):
+        try:
+            with open(index_file, "r", encoding="utf-8") as f:
+                index = json.load(f)
+            if index.get("root") == root:
+                return index
+        except (OSError, ValueError):
+            print(f"⚠️ Scoring chart index unreadable, rebuilding: {index_file}")
+    return _empty_index(root)
+
+def _save_index(index, index_file):
+    """Writes the index next to its final location first so readers never see a partial file."""
+    os.makedirs(os.path.dirname(index_file) or ".", exist_ok=True)
+    tmp_path = f"{index_file}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(index, f)
+    os.replace(tmp_path, index_file)
+
+def _chart_patient(name):
+    """The patient id of a scoring chart file name, or None for any other file."""
+    if name.endswith(".xlsx") and CHART_MARKER in name:
+        return name.partition(CHART_MARKER)[0]
+    return None
+
+def _scan_dir(index, dirpath, contested):
+    """
+    Lists a single directory, recording its charts and mtime.
+    A patient whose indexed chart still exists elsewhere is added to contested instead.
+    Returns the subdirectories that are not in the index yet, in listing order.
+    """
+    charts = index["charts"]
+    new_dirs = []
+    try:
+        index["dirs"][dirpath] = os.stat(dirpath).st_mtime
+        entries = list(os.scandir(dirpath))
+    except OSError:
+        index["dirs"].pop(dirpath, None)
+        return new_dirs
+
+    for entry in entries:
+        if entry.is_dir():
+            if entry.path not in index["dirs"]:
+                new_dirs.append(entry.path)
+            continue
+        patient_id = _chart_patient(entry.name)
+        if patient_id is None:
+            continue
+        existing = charts.get(patient_id)
+        if existing is None or existing[0] == entry.path or not os.path.exists(existing[0]):
+            charts[patient_id] = [entry.path, entry.stat().st_mtime]
+        else:
+            contested.add(patient_id)
+    return new_dirs
+
+def _resolve_in_walk_order(index, patient_ids):
+    """
+    Points each patient at the first chart a top-down os.walk of the tree finds, the chart
+    the original lookup returned; patients left without a chart are dropped.
+    """
+    found = {}
+    for dirpath, _, files in os.walk(index["root"]):
+        for name in files:
+            patient_id = _chart_patient(name)
+            if patient_id in patient_ids and patient_id not in found:
+                path = os.path.join(dirpath, name)
+                found[patient_id] = [path, os.stat(path).st_mtime]
+        if len(found) == len(patient_ids):
+            break
+    for patient_id in patient_ids:
+        if patient_id in found:
+            index["charts"][patient_id] = found[patient_id]
+        else:
+            index["charts"].pop(patient_id, None)
+
+def refresh_index(index):
+    """
+    Brings the index up to date with the scoring_charts tree.
+    Only directories whose mtime changed (or that are new) are listed again, depth-first
+    in listing order like os.walk, so a first scan keeps the chart os.walk would find first
+    for a patient with several. Patients whose charts were added or removed next to another
+    chart of theirs are settled with one os.walk.
+    Returns True when anything changed.
+    """
+    root = index["root"]
+    changed = False
+    first_scan = root not in index["dirs"]
+    pending = [root] if first_scan else []
+    contested = set()
+
+    for dirpath, mtime in list(index["dirs"].items()):
+        try:
+            current = os.stat(dirpath).st_mtime
+        except OSError:
+            # Directory removed: forget it and every chart that lived in it
+            del index["dirs"][dirpath]
+            for patient_id, (path, _) in list(index["charts"].items()):
+                if os.path.dirname(path) == dirpath:
+                    del index["charts"][patient_id]
+                    contested.add(patient_id)
+            changed = True
+            continue
+        if current != mtime:
+            pending.append(dirpath)
+
+    # A stack with children pushed in reverse visits the tree in os.walk's top-down order
+    pending.reverse()
+    while pending:
+        dirpath = pending.pop()
+        pending.extend(reversed(_scan_dir(index, dirpath, contested)))
+        changed = True
+
+    # Drop charts that were deleted from a directory we re-listed
+    for patient_id, (path, _) in list(index["charts"].items()):
+        if os.path.dirname(path) in index["dirs"] and not os.path.exists(path):
+            del index["charts"][patient_id]
+            contested.add(patient_id)
+            changed = True
+
+    # A first scan already met every chart in walk order, so the one it kept is the right one
+    if contested and not first_scan:
+        _resolve_in_walk_order(index, contested)
+    return changed
+
+def _get_index():
+    global _INDEX
+    if _INDEX is None or _INDEX["root"] != scoring_charts:
+        _INDEX = _load_index(scoring_charts, SCORING_CHART_INDEX_FILE)
+    return _INDEX
+
+def get_scoring_chart_entry(patient_id):
+    """Returns [path, mtime] for the patient's scoring chart, or None if there is none."""
+    with _LOCK:
+        index = _get_index()
+        entry = index["charts"].get(patient_id)
+        if entry is not None:
+            try:
+                # Charts edited in place keep their path, so only the mtime needs refreshing
+                entry[1] = os.stat(entry[0]).st_mtime
+                return entry
+            except OSError:
+                pass
+
+        # Unknown or moved chart: refresh only the parts of the tree that changed
+        if refresh_index(index):
+            _save_index(index, SCORING_CHART_INDEX_FILE)
+        return index["charts"].get(patient_id)
+
+def find_scoring_chart(patient_id):
+    """Returns the path of the patient's scoring chart, or None if there is none."""
+    entry = get_scoring_chart_entry(patient_id)
+    return entry[0] if entry else None
+
+def rebuild_index():
+    """Discards the stored index and scans the whole scoring_charts tree once."""
+    global _INDEX
+    with _LOCK:
+        _INDEX = _empty_index(scoring_charts)
+        refresh_index(_INDEX)
+        _save_index(_INDEX, SCORING_CHART_INDEX_FILE)
+        return len(_INDEX["charts"])
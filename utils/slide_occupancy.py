@@ -0,0 +1,60 @@
+import threading
+import weakref
+
+# Template shapes only count as content between these Y-coordinates (1 cm = 360000 EMUs)
+START_Y = 9 * 360000
+MAX_Y = 26 * 360000
+
+# package -> set of partnames of the slides that hold content
+_OCCUPIED = weakref.WeakKeyDictionary()
+_LOCK = threading.Lock()
+
+def has_content(slide):
+    """Checks if a slide contains any shapes (images, textboxes, or tables) in the valid area."""
+    # Check for shapes in valid area
+    for shape in slide.shapes:
+        if hasattr(shape, "top") and shape.top is not None and START_Y <= shape.top <= MAX_Y:
+            return True
+        # Check specifically for tables
+        if shape.has_table:
+            return True
+    return False
+
+def template_occupancy(prs):
+    """Returns the partnames of the slides of a template that already hold content."""
+    return frozenset(slide.part.partname for slide in prs.slides if has_content(slide))
+
+def track_slides(prs, occupied_partnames):
+    """Starts tracking a deck, seeded with the slides its template already fills."""
+    with _LOCK:
+        _OCCUPIED[prs.part.package] = set(occupied_partnames)
+
+def mark_occupied(slide):
+    """Records that a step placed content on a slide of a tracked deck."""
+    with _LOCK:
+        occupied = _OCCUPIED.get(slide.part.package)
+        if occupied is not None:
+            occupied.add(slide.part.partname)
+
+def find_empty_slides(prs):
+    """
+    Indexes of the slides without content. Tracked decks answer from what the template
+    and the steps placed; any other deck is scanned shape by shape.
+    """
+    with _LOCK:
+        occupied = _OCCUPIED.get(prs.part.package)
+        occupied = set(occupied) if occupied is not None else None
+    if occupied is None:
+        return [i for i, slide in enumerate(prs.slides) if not has_content(slide)]
+    return [i for i, slide in enumerate(prs.slides) if slide.part.partname not in occupied]
+
+def drop_slides(prs, slide_indexes):
+    """
+    Removes slides from the deck and from the package: once the presentation no longer
+    relates to a slide part, neither it nor its rels, notes or slide-only media are written.
+    """
+    xml_slides = prs.slides._sldIdLst
+    for i in sorted(slide_indexes, reverse=True):
+        sld_id = xml_slides[i]
+        xml_slides.remove(sld_id)
+        prs.part.drop_rel(sld_id.rId)
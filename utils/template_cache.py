@@ -0,0 +1,66 @@
+import copy
+import io
+import os
+import threading
+from pptx import Presentation
+from config import lifeStyle_template
+from utils.slide_occupancy import template_occupancy, track_slides
+
+# path -> (signature, raw template bytes, parsed master Presentation)
+_TEMPLATE_CACHE = {}
+# path -> (signature, partnames of the template slides that already hold content)
+_OCCUPANCY = {}
+_LOCK = threading.Lock()
+
+def _file_signature(path):
+    """Returns the (mtime, size) pair used to detect a changed template file."""
+    stat = os.stat(path)
+    return stat.st_mtime_ns, stat.st_size
+
+def _get_entry(path):
+    """Returns the cache entry for the template, (re)parsing it when the file changed on disk."""
+    signature = _file_signature(path)
+    with _LOCK:
+        entry = _TEMPLATE_CACHE.get(path)
+        if entry is None or entry[0] != signature:
+            with open(path, "rb") as f:
+                blob = f.read()
+            entry = (signature, blob, Presentation(io.BytesIO(blob)))
+            _TEMPLATE_CACHE[path] = entry
+            print(f"📂 Template parsed and cached: {path}")
+        return entry
+
+def get_template_bytes(path=lifeStyle_template):
+    """Returns the raw bytes of the cached template package."""
+    return _get_entry(path)[1]
+
+def get_template_package(path=lifeStyle_template):
+    """
+    Returns the (signature, raw bytes, parsed master Presentation) of the cached template.
+    The master is shared and must only be read.
+    """
+    return _get_entry(path)
+
+def load_template(path=lifeStyle_template):
+    """
+    Returns a fresh Presentation cloned from the cached, pre-parsed template.
+    The cached master is never handed out, so each patient gets an independent deck.
+    """
+    signature, _, master = _get_entry(path)
+    with _LOCK:
+        occupancy = _OCCUPANCY.get(path)
+        if occupancy is None or occupancy[0] != signature:
+            # Scanned on a throwaway clone: reading master.slides would cache child elements on the
+            # master that deepcopy then detaches from every later clone
+            occupancy = (signature, template_occupancy(copy.deepcopy(master)))
+            _OCCUPANCY[path] = occupancy
+        prs = copy.deepcopy(master)
+    # Empty slides are then known from what the steps place, without rescanning the deck
+    track_slides(prs, occupancy[1])
+    return prs
+
+def clear_template_cache():
+    """Drops every cached template so the next load re-reads it from disk."""
+    with _LOCK:
+        _TEMPLATE_CACHE.clear()
+        _OCCUPANCY.clear()